@@ -1,122 +1,367 @@
 import openmeteo_requests
+import numpy as np
 import pandas as pd
-import requests_cache
 from retry_requests import retry
 import os
-import joblib  # ✅ pickle 대신 joblib 사용 (scikit-learn 호환성 더 좋음)
+import threading
+import cassette
+import http_cache
+import argparse
+from model_registry import ModelRegistry, MODEL_FEATURES, QUANTILE_COLUMNS, clean_plant_name, feature_matrix
+from parallel_inference import run_inference
+from weather_features import load_hourly_daily, split_by_plant
+from run_metrics import RunMetrics, RUN_RECORD_FILENAME
+from openmeteo_fetch import DEFAULT_CHUNK_SIZE, DEFAULT_CONCURRENCY, fetch_in_chunks
+import weather_grid
+from forecast_store import (
+    FORECAST_CSV, FORECAST_PARQUET, FINGERPRINT_FILENAME, PREDICTION_COLUMNS,
+    compute_fingerprints, load_previous_forecast, previous_lookup, carry_over_predictions, attach_predictions,
+    save_fingerprints, write_forecast,
+)
+
+LOCATION_FILE = "data/locations_원본.csv"
+OUTPUT_FILENAME = FORECAST_CSV
+
+# 필수 컬럼
+REQUIRED_COLS = ['발전기명', '위도', '경도', '설비용량(MW)']
+
+FINAL_COLUMNS = [
+    '날짜', '발전기명', '설비용량(MW)', '발전량_예측(MWh)',
+    *QUANTILE_COLUMNS,
+    '평균기온', '평균습도', '총강수량', '총적설량', '평균풍속',
+    '일조시간', '일사량', '평균운량', '위도', '경도'
+]
+
 
 # --- 1. 로케이션 파일 먼저 불러오기 ---
-location_file = "data/locations_원본.csv"
-if not os.path.exists(location_file):
-    print(f"오류: '{location_file}' 파일을 찾을 수 없습니다.")
-    exit()
-
-print(f"'{location_file}' 파일 로드 중...")
-location_df = pd.read_csv(location_file)
-location_df.columns = location_df.columns.str.strip()
-
-# 필수 컬럼 확인
-required_cols = ['발전기명', '위도', '경도', '설비용량(MW)']
-if not all(col in location_df.columns for col in required_cols):
-    print(f"오류: '{location_file}'에 필요한 컬럼({required_cols})이 모두 없습니다!")
-    print(f"(현재 컬럼: {location_df.columns.tolist()})")
-    exit()
-
-# 모델 학습에 사용된 변수 (순서 중요!)
-MODEL_FEATURES = [
-    '설비용량(MW)', '평균기온', '평균습도', '총강수량', '총적설량',
-    '평균풍속', '일조시간', '일사량', '평균운량'
+def load_locations(location_file=LOCATION_FILE):
+    if not os.path.exists(location_file):
+        print(f"오류: '{location_file}' 파일을 찾을 수 없습니다.")
+        exit()
+
+    print(f"'{location_file}' 파일 로드 중...")
+    location_df = pd.read_csv(location_file)
+    location_df.columns = location_df.columns.str.strip()
+
+    # 필수 컬럼 확인
+    if not all(col in location_df.columns for col in REQUIRED_COLS):
+        print(f"오류: '{location_file}'에 필요한 컬럼({REQUIRED_COLS})이 모두 없습니다!")
+        print(f"(현재 컬럼: {location_df.columns.tolist()})")
+        exit()
+
+    return location_df
+
+
+# --- 2. Open-Meteo API 호출 ---
+OPENMETEO_URL = "https://api.open-meteo.com/v1/forecast"
+DAILY_VARIABLES = [
+    "temperature_2m_mean", "relative_humidity_2m_mean", "precipitation_sum",
+    "snowfall_sum", "wind_speed_10m_mean", "sunshine_duration",
+    "shortwave_radiation_sum", "cloud_cover_mean"
 ]
 
-# --- 2. Open-Meteo API 설정 ---
-cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-openmeteo = openmeteo_requests.Client(session=retry_session)
-
-url = "https://api.open-meteo.com/v1/forecast"
-params = {
-    "latitude": location_df['위도'].tolist(),
-    "longitude": location_df['경도'].tolist(),
-    "daily": [
-        "temperature_2m_mean", "relative_humidity_2m_mean", "precipitation_sum",
-        "snowfall_sum", "wind_speed_10m_mean", "sunshine_duration",
-        "shortwave_radiation_sum", "cloud_cover_mean"
-    ]
-}
-responses = openmeteo.weather_api(url, params=params)
-all_dataframes = []
 
-print("날씨 API (Forecast-Daily) 데이터 처리 중...")
+def fetch_weather(location_df, metrics=None, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=DEFAULT_CONCURRENCY,
+                  grid=weather_grid.OPENMETEO_GRID_DEG, cache_stats=None):
+    """
+    서로 grid(도) 이내인 발전소는 대표 좌표로 한 번만 묶음 요청하고,
+    location_df 순서대로 응답 리스트 반환 (끝까지 실패한 발전소 자리는 None)
+    cache_stats(http_cache.CacheStats)를 넘기면 HTTP 캐시 적중/미스 수를 거기에 모음
+    """
+    cache_stats = cache_stats if cache_stats is not None else http_cache.CacheStats()
+    local = threading.local()
+    sessions = []
+    sessions_lock = threading.Lock()
+
+    def get_client():
+        # requests 세션은 스레드 간 공유가 안전하지 않으므로 스레드마다 하나씩 생성
+        if not hasattr(local, "client"):
+            cache_session = http_cache.make_session(cache_stats)
+            retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+            # CASSETTE_MODE=record/replay이면 응답을 녹화하거나 녹화본으로 대체
+            session = cassette.wrap(retry_session)
+            with sessions_lock:
+                sessions.append(session)
+            local.client = openmeteo_requests.Client(session=session)
+        return local.client
+
+    def fetch_chunk(chunk_df):
+        params = {
+            "latitude": chunk_df['위도'].tolist(),
+            "longitude": chunk_df['경도'].tolist(),
+            "daily": DAILY_VARIABLES
+        }
+        return get_client().weather_api(OPENMETEO_URL, params=params)
+
+    cells, cell_index = weather_grid.group_by_cell(location_df, grid)
+    weather_grid.report(cells, len(location_df), "Open-Meteo")
+    cell_responses = fetch_in_chunks(
+        cells, fetch_chunk, chunk_size=chunk_size, max_concurrency=concurrency, metrics=metrics
+    )
+    responses = weather_grid.fan_out(cell_responses, cell_index)
+
+    if metrics is not None:
+        metrics.set("grid_cells", len(cells))
+        metrics.set("api_responses", sum(r is not None for r in responses))
+        metrics.set("http_cache_hits", cache_stats.hits)
+        metrics.set("http_cache_misses", cache_stats.misses)
+        cassettes = [s for s in sessions if isinstance(s, cassette.CassetteSession)]
+        if cassettes:
+            metrics.set("cassette_recorded", sum(s.recorded for s in cassettes))
+            metrics.set("cassette_replayed", sum(s.replayed for s in cassettes))
+    return responses
+
 
 # --- 3. 데이터 처리 ---
-for i, response in enumerate(responses):
-    daily = response.Daily()
-    daily_data = {
-        "날짜": pd.date_range(
-            start=pd.to_datetime(daily.Time(), unit="s", utc=True),
-            end=pd.to_datetime(daily.TimeEnd(), unit="s", utc=True),
-            freq=pd.Timedelta(seconds=daily.Interval()),
-            inclusive="left"
-        ).date,
-        "평균기온": daily.Variables(0).ValuesAsNumpy(),
-        "평균습도": daily.Variables(1).ValuesAsNumpy(),
-        "총강수량": daily.Variables(2).ValuesAsNumpy(),
-        "총적설량": daily.Variables(3).ValuesAsNumpy(),
-        "평균풍속": daily.Variables(4).ValuesAsNumpy() / 3.6,
-        "일조시간": daily.Variables(5).ValuesAsNumpy() / 3600.0,
-        "일사량": daily.Variables(6).ValuesAsNumpy() * 0.0036,
-        "평균운량": daily.Variables(7).ValuesAsNumpy()
-    }
-
-    daily_df = pd.DataFrame(data=daily_data)
-
-    plant_name = location_df.iloc[i]['발전기명']
-    daily_df['발전기명'] = plant_name
-    daily_df['위도'] = location_df.iloc[i]['위도']
-    daily_df['경도'] = location_df.iloc[i]['경도']
-    daily_df['설비용량(MW)'] = location_df.iloc[i]['설비용량(MW)']
-
-    # 모델 파일 경로 설정
-    clean_name = plant_name.strip().replace(' ', '')
-    model_path = f"models/rf_full_{clean_name}_step9.pkl"
-
-    # --- 모델 예측 ---
-    if os.path.exists(model_path):
-        try:
-            # ✅ joblib으로 로드 (pickle보다 안정적)
-            loaded_model = joblib.load(model_path)
-
-            X_test = daily_df[MODEL_FEATURES].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-            predictions = loaded_model.predict(X_test)
-            daily_df['발전량_예측(MWh)'] = predictions
-
-            print(f"✅ '{clean_name}' 모델 예측 성공.")
-
-        except Exception as e:
-            print(f"⚠️ '{plant_name}' 모델 예측 중 오류 발생: {e.__class__.__name__} → {e}")
-            daily_df['발전량_예측(MWh)'] = pd.NA
+# DAILY_VARIABLES 순서와 같은 일별 컬럼명
+DAILY_COLUMNS = ['평균기온', '평균습도', '총강수량', '총적설량', '평균풍속', '일조시간', '일사량', '평균운량']
+# 단위 변환 (풍속 km/h → m/s, 일조시간 초 → 시간, 일사량 × 0.0036) — 변수 축으로 한 번에 broadcast
+UNIT_DIVISOR = np.array([1, 1, 1, 1, 3.6, 3600.0, 1, 1], dtype=np.float32)
+UNIT_MULTIPLIER = np.array([1, 1, 1, 1, 1, 1, 0.0036, 1], dtype=np.float32)
+
+
+def decode_daily_array(responses):
+    """
+    응답 리스트 → (값 배열[발전소 × 일 × 변수] float32, 날짜 배열[발전소 × 일] 초, 유효 마스크[발전소 × 일])
+    (None 응답인 발전소는 유효 마스크가 모두 False)
+    """
+    dailies = [None if response is None else response.Daily() for response in responses]
+    n_days = max(
+        (int((d.TimeEnd() - d.Time()) // d.Interval()) for d in dailies if d is not None), default=0
+    )
+
+    values = np.full((len(responses), n_days, len(DAILY_COLUMNS)), np.nan, dtype=np.float32)
+    seconds = np.zeros((len(responses), n_days), dtype=np.int64)
+    valid = np.zeros((len(responses), n_days), dtype=bool)
+    steps = np.arange(n_days, dtype=np.int64)
+
+    for p, daily in enumerate(dailies):
+        if daily is None:
+            continue
+        length = int((daily.TimeEnd() - daily.Time()) // daily.Interval())
+        for k in range(len(DAILY_COLUMNS)):
+            values[p, :length, k] = daily.Variables(k).ValuesAsNumpy()[:length]
+        seconds[p] = daily.Time() + steps * daily.Interval()
+        valid[p, :length] = True
+
+    values = values / UNIT_DIVISOR * UNIT_MULTIPLIER
+    return values, seconds, valid
+
+
+def _decode_with_counts(responses, location_df):
+    for i, response in enumerate(responses):
+        if response is None:
+            print(f"⚠️ 경고: '{location_df.iloc[i]['발전기명']}'의 날씨 응답이 없어 건너뜁니다.")
+
+    values, seconds, valid = decode_daily_array(responses)
+    flat = valid.ravel()
+    plant_idx = np.repeat(np.arange(len(responses)), valid.shape[1])[flat]
+
+    daily_df = pd.DataFrame(values.reshape(-1, len(DAILY_COLUMNS))[flat], columns=DAILY_COLUMNS)
+    daily_df.insert(0, '날짜', pd.to_datetime(seconds.ravel()[flat], unit='s').date)
+    for col in ('발전기명', '위도', '경도', '설비용량(MW)'):
+        daily_df[col] = location_df[col].to_numpy()[plant_idx]
+    return daily_df, valid.sum(axis=1)
+
+
+def decode_daily_frame(responses, location_df):
+    """
+    모든 발전소의 일별 응답을 한 번에 (발전소, 날짜) long DataFrame으로 변환
+    """
+    return _decode_with_counts(responses, location_df)[0]
+
+
+def decode_responses(responses, location_df):
+    """
+    발전소별 DataFrame 리스트 (decode_daily_frame 결과를 발전소 단위로 자름)
+    """
+    daily_df, counts = _decode_with_counts(responses, location_df)
+    stops = np.cumsum(counts)
+    starts = stops - counts
+    return [
+        daily_df.iloc[start:stop].reset_index(drop=True)
+        for start, stop in zip(starts, stops) if stop > start
+    ]
+
+
+# --- 4. 모델 예측 (병렬 추론 단계) ---
+def predict_all(all_dataframes, model_registry, workers=1, previous=None, metrics=None):
+    """
+    발전소별 DataFrame 리스트 → 예측 컬럼(PREDICTION_COLUMNS)과 입력 지문이 붙은 새 DataFrame 리스트
+    (예측값은 발전소마다 배열로 모았다가 마지막에 한 번만 DataFrame에 붙임)
+    """
+    jobs = []
+    job_targets = []
+    reused_rows = 0
+    lookup = previous_lookup(previous)
+    # 발전소별 (예측값 배열 (n_rows, len(PREDICTION_COLUMNS)), 입력 지문 또는 None)
+    outputs = []
+    for daily_df in all_dataframes:
+        plant_name = daily_df['발전기명'].iloc[0]
+        if not model_registry.has_model(plant_name):
+            print(f"⚠️ 경고: '{model_registry.model_path(plant_name)}' 모델 파일을 찾을 수 없습니다.")
+            outputs.append((np.full((len(daily_df), len(PREDICTION_COLUMNS)), np.nan), None))
+            if metrics is not None:
+                metrics.plant(plant_name, rows=len(daily_df), status="no_model")
+            continue
+
+        # 모델 입력 배열은 발전소마다 한 번만 만들어 지문 계산과 예측에 함께 사용
+        features = feature_matrix(daily_df)
+        fingerprints = compute_fingerprints(features, model_registry.model_version(plant_name))
+
+        # 입력이 이전 실행과 같은 (발전기명, 날짜)는 이전 예측값을 그대로 사용
+        values, changed = carry_over_predictions(daily_df, lookup, fingerprints)
+        outputs.append((values, fingerprints))
+        reused_rows += int((~changed).sum())
+
+        if changed.any():
+            jobs.append((plant_name, features[changed]))
+            job_targets.append((plant_name, values, changed))
+        else:
+            print(f"♻️ '{clean_plant_name(plant_name)}' 입력 변화 없음 → 이전 예측 재사용.")
+            if metrics is not None:
+                metrics.plant(plant_name, rows=0, status="reused")
+
+    if reused_rows:
+        print(f"♻️ 총 {reused_rows}개 행은 입력이 바뀌지 않아 이전 예측을 재사용했습니다.")
+
+    # 결과는 jobs 순서 그대로 돌아오므로 발전소별 예측값 배열에 순서대로 채움
+    timings = []
+    results = run_inference(
+        jobs, workers=workers, model_dir=model_registry.model_dir, max_models=model_registry.max_models,
+        registry=model_registry, timings=timings,
+    )
+    for (plant_name, values, changed), (predictions, error), elapsed in zip(job_targets, results, timings):
+        if metrics is not None:
+            metrics.plant(plant_name, seconds=elapsed, rows=int(changed.sum()),
+                          status="ok" if error is None else "error")
+        if error is None:
+            point, quantiles = predictions
+            values[changed, 0] = point
+            # 트리별 예측값 분포에서 얻은 P10/P50/P90 (분포가 없는 모델이면 비워 둠)
+            if quantiles is not None:
+                values[changed, 1:] = np.asarray(quantiles).T
+            print(f"✅ '{clean_plant_name(plant_name)}' 모델 예측 성공 ({int(changed.sum())}행).")
+        else:
+            print(f"⚠️ '{plant_name}' 모델 예측 중 오류 발생: {error}")
+            values[changed] = np.nan
+
+    if metrics is not None:
+        metrics.set("rows_reused", reused_rows)
+        metrics.set("rows_predicted", sum(int(changed.sum()) for _, _, changed in job_targets))
+    return [attach_predictions(daily_df, values, fingerprints)
+            for daily_df, (values, fingerprints) in zip(all_dataframes, outputs)]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Open-Meteo 7일 예보 기반 발전소별 발전량 예측")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="모델 예측에 사용할 프로세스 수 (기본값 1: 단일 프로세스)"
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="이전 예측을 재사용하지 않고 모든 (발전소, 날짜)를 다시 예측"
+    )
+    parser.add_argument(
+        "--hourly-file", default=None,
+        help="일별 API 대신 시간별 예보 파일(예: 최종_날씨_예측_데이터.csv)을 KST 일 단위로 집계해 사용"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Open-Meteo 요청 한 번에 넣을 발전소 수 (기본값 {DEFAULT_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help=f"동시에 보낼 Open-Meteo 요청 수 (기본값 {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--grid", type=float, default=weather_grid.OPENMETEO_GRID_DEG,
+        help=f"한 번만 요청할 만큼 가까운 발전소로 볼 거리(도) (기본값 {weather_grid.OPENMETEO_GRID_DEG}, 0이면 같은 좌표만 묶음)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # 단계별 실행 시간/건수를 모아 예측 파일 옆에 JSON 실행 기록으로 저장
+    metrics = RunMetrics("7일발전량예측")
+    metrics.set("workers", args.workers)
+    metrics.set("source", "hourly_file" if args.hourly_file else "openmeteo_daily")
+    cache_stats = http_cache.CacheStats()
+
+    with metrics.stage("locations"):
+        location_df = load_locations()
+    metrics.set("plants", len(location_df))
+
+    # 모델 디렉터리는 한 번만 색인하고, 발전소 모델은 필요할 때 한 번씩만 로드
+    model_registry = ModelRegistry()
+
+    if args.hourly_file:
+        # 이미 받아 둔 시간별 예보에서 일별 입력을 만들어 API를 다시 호출하지 않음
+        print(f"시간별 예보 '{args.hourly_file}'을(를) 일별로 집계하는 중...")
+        with metrics.stage("decode"):
+            daily_df = load_hourly_daily(args.hourly_file, location_df)
+            all_dataframes = split_by_plant(daily_df, location_df)
     else:
-        print(f"⚠️ 경고: '{model_path}' 모델 파일을 찾을 수 없습니다.")
-        daily_df['발전량_예측(MWh)'] = pd.NA
+        with metrics.stage("fetch"):
+            responses = fetch_weather(
+                location_df, metrics, chunk_size=args.chunk_size, concurrency=args.concurrency, grid=args.grid,
+                cache_stats=cache_stats
+            )
 
-    all_dataframes.append(daily_df)
+        print("날씨 API (Forecast-Daily) 데이터 처리 중...")
+        with metrics.stage("decode"):
+            all_dataframes = decode_responses(responses, location_df)
+    metrics.set("rows_input", sum(len(df) for df in all_dataframes))
+    if not all_dataframes:
+        print("❌ 예측에 사용할 날씨 데이터가 없습니다. 기존 예측 파일을 그대로 둡니다.")
+        return
 
-# --- 4. 데이터 통합 및 저장 ---
-print("날씨 API 데이터 처리 완료. 데이터 통합 및 저장 중...")
+    if args.workers > 1:
+        print(f"모델 예측을 {args.workers}개 프로세스로 병렬 실행합니다...")
+    with metrics.stage("predict"):
+        previous = None if args.full else load_previous_forecast(OUTPUT_FILENAME, FINGERPRINT_FILENAME)
+        all_dataframes = predict_all(
+            all_dataframes, model_registry, workers=args.workers, previous=previous, metrics=metrics
+        )
+    # (workers > 1이면 모델은 워커 프로세스에서 로드되므로 부모 레지스트리 수치에는 잡히지 않음)
+    registry_stats = model_registry.stats()
+    metrics.set("models_loaded", registry_stats["loads"])
+    metrics.set("model_cache_hits", registry_stats["hits"])
 
-final_df = pd.concat(all_dataframes, ignore_index=True)
+    # --- 5. 데이터 통합 및 저장 ---
+    print("날씨 API 데이터 처리 완료. 데이터 통합 및 저장 중...")
 
-# --- 5. 컬럼 정리 ---
-final_columns = [
-    '날짜', '발전기명', '설비용량(MW)', '발전량_예측(MWh)',
-    '평균기온', '평균습도', '총강수량', '총적설량', '평균풍속',
-    '일조시간', '일사량', '평균운량', '위도', '경도'
-]
-final_df = final_df[[col for col in final_columns if col in final_df.columns]]
+    with metrics.stage("concat"):
+        final_df = pd.concat(all_dataframes, ignore_index=True)
+
+    with metrics.stage("write"):
+        # 다음 실행에서 변경 여부를 비교할 입력 지문을 예측 파일 옆에 저장
+        save_fingerprints(final_df, FINGERPRINT_FILENAME)
+
+        # --- 6. 컬럼 정리 ---
+        final_df = final_df[[col for col in FINAL_COLUMNS if col in final_df.columns]]
+
+        # --- 7. 파일 저장 (CSV + 대시보드용 Parquet) ---
+        write_forecast(final_df, OUTPUT_FILENAME, FORECAST_PARQUET)
+    metrics.set("rows_output", len(final_df))
+
+    print(f"\n🎉 작업 완료! '{OUTPUT_FILENAME}' / '{FORECAST_PARQUET}' 파일로 저장되었습니다.")
+
+    # HTTP 캐시(.cache.sqlite) 정리: 만료 삭제 → 크기 상한 → 주기적 VACUUM
+    with metrics.stage("cache_maintenance"):
+        cache_result = http_cache.maintain()
+    http_cache.report(cache_stats, cache_result)
+    for key, value in cache_result.items():
+        metrics.set(f"http_cache_{key}", value)
+
+    metrics.print_summary()
+    run_record_path = os.path.join(os.path.dirname(OUTPUT_FILENAME), RUN_RECORD_FILENAME)
+    metrics.write(run_record_path)
+    print(f"📝 실행 기록을 '{run_record_path}' 파일로 저장했습니다.")
 
-# --- 6. 파일 저장 ---
-output_filename = "최종_일별_발전량_예측.csv"
-final_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
 
-print(f"\n🎉 작업 완료! '{output_filename}' 파일로 저장되었습니다.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# benchmark_forecast.py
+# 합성 발전소 N개로 7일 예측 파이프라인(decode → features → predict → write) 처리량 측정
+# - 발전소 좌표/설비용량, Open-Meteo 일별 응답, 대체(stand-in) 모델을 모두 합성
+# - 규모마다 새 프로세스에서 실행해 plant-days/s와 최대 메모리(peak RSS)를 따로 측정
+#
+# 사용 예) python benchmark_forecast.py
+#         python benchmark_forecast.py --plants 100 1000 10000 --workers 4 --output benchmark.json
+
+import io
+import sys
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import importlib
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from model_registry import ModelRegistry, MODEL_FEATURES
+from forest_compiler import compile_forest, check_against
+from forecast_store import write_forecast
+from run_metrics import RunMetrics
+
+# 파일명이 숫자로 시작해 일반 import 문으로는 불러올 수 없음
+forecast_job = importlib.import_module("7일발전량예측api")
+
+DEFAULT_PLANTS = (100, 1000, 10000)
+DEFAULT_DAYS = 7
+SECONDS_PER_DAY = 86400
+
+# 한반도 범위 (위도, 경도)
+LAT_RANGE = (33.2, 38.5)
+LON_RANGE = (126.0, 129.5)
+
+# 측정에 포함하는 단계 (합성 데이터/모델 준비 시간은 제외)
+TIMED_STAGES = ("decode", "predict", "concat", "write")
+
+
+# -----------------------------
+# 합성 발전소 / 날씨 응답
+# -----------------------------
+def make_locations(n_plants, rng):
+    return pd.DataFrame({
+        '지점': np.arange(n_plants),
+        '발전기명': [f"합성발전소{i:05d}" for i in range(n_plants)],
+        '위도': rng.uniform(*LAT_RANGE, n_plants).round(5),
+        '경도': rng.uniform(*LON_RANGE, n_plants).round(5),
+        '발전사': '합성',
+        '설비용량(MW)': rng.uniform(0.5, 20.0, n_plants).round(2),
+    })
+
+
+class _SyntheticVariable:
+    def __init__(self, values):
+        self._values = values
+
+    def ValuesAsNumpy(self):
+        return self._values
+
+
+class _SyntheticDaily:
+    """
+    openmeteo_sdk의 VariablesWithTime과 같은 메서드(Time/TimeEnd/Interval/Variables)만 흉내 냄
+    """
+
+    def __init__(self, start, days, variables):
+        self._start = start
+        self._days = days
+        self._variables = variables
+
+    def Time(self):
+        return self._start
+
+    def TimeEnd(self):
+        return self._start + self._days * SECONDS_PER_DAY
+
+    def Interval(self):
+        return SECONDS_PER_DAY
+
+    def VariablesLength(self):
+        return len(self._variables)
+
+    def Variables(self, index):
+        return _SyntheticVariable(self._variables[index])
+
+
+class _SyntheticResponse:
+    def __init__(self, daily):
+        self._daily = daily
+
+    def Daily(self):
+        return self._daily
+
+
+def make_responses(n_plants, days, rng, start=None):
+    """
+    Open-Meteo 일별 응답과 같은 단위(풍속 km/h, 일조 초, 일사 MJ/m²)의 합성 응답 리스트
+    """
+    if start is None:
+        start = int(pd.Timestamp.now(tz="UTC").normalize().timestamp())
+    shape = (n_plants, days)
+    variables = [
+        rng.uniform(-5, 30, shape),                          # temperature_2m_mean
+        rng.uniform(30, 95, shape),                          # relative_humidity_2m_mean
+        rng.gamma(0.3, 4.0, shape),                          # precipitation_sum
+        np.where(rng.random(shape) < 0.05, rng.gamma(0.5, 2.0, shape), 0.0),  # snowfall_sum
+        rng.uniform(0, 40, shape),                           # wind_speed_10m_mean
+        rng.uniform(0, 36000, shape),                        # sunshine_duration
+        rng.uniform(0, 25, shape),                           # shortwave_radiation_sum
+        rng.uniform(0, 100, shape),                          # cloud_cover_mean
+    ]
+    variables = [v.astype(np.float32) for v in variables]
+    return [
+        _SyntheticResponse(_SyntheticDaily(start, days, [v[i] for v in variables]))
+        for i in range(n_plants)
+    ]
+
+
+# -----------------------------
+# 대체 모델 (발전소마다 템플릿 모델 파일을 링크)
+# -----------------------------
+def build_template_models(template_dir, n_templates, n_trees, max_depth, rng):
+    paths = []
+    for t in range(n_templates):
+        X = pd.DataFrame({
+            '설비용량(MW)': rng.uniform(0.5, 20.0, 2000),
+            '평균기온': rng.uniform(-5, 30, 2000),
+            '평균습도': rng.uniform(30, 95, 2000),
+            '총강수량': rng.gamma(0.3, 4.0, 2000),
+            '총적설량': np.zeros(2000),
+            '평균풍속': rng.uniform(0, 11, 2000),
+            '일조시간': rng.uniform(0, 10, 2000),
+            '일사량': rng.uniform(0, 0.09, 2000),
+            '평균운량': rng.uniform(0, 100, 2000),
+        })[MODEL_FEATURES]
+        y = X['설비용량(MW)'] * X['일조시간'] * rng.uniform(0.08, 0.15) + rng.normal(0, 0.1, len(X))
+        model = RandomForestRegressor(
+            n_estimators=n_trees, max_depth=max_depth, random_state=t, n_jobs=1
+        ).fit(X, y)
+        path = os.path.join(template_dir, f"template_{t}.forest")
+        forest = compile_forest(model)
+        check_against(model, forest)
+        forest.save(path)
+        paths.append(path)
+    return paths
+
+
+def link_plant_models(location_df, template_paths, model_dir):
+    os.makedirs(model_dir, exist_ok=True)
+    for i, name in enumerate(location_df['발전기명']):
+        target = os.path.join(model_dir, f"rf_full_{name}_step9.forest")
+        source = template_paths[i % len(template_paths)]
+        try:
+            os.link(source, target)
+        except OSError:
+            # 하드 링크를 지원하지 않는 파일 시스템이면 복사
+            shutil.copyfile(source, target)
+
+
+# -----------------------------
+# 측정
+# -----------------------------
+def _peak_rss_mb():
+    """
+    (현재 프로세스, 자식 프로세스 중 최대) peak RSS(MB) — resource 모듈이 없는 Windows는 None
+    """
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # Linux는 KB, macOS는 byte 단위
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+    return round(self_rss, 1), round(children_rss, 1)
+
+
+def run_scale(n_plants, days=DEFAULT_DAYS, workers=1, n_templates=4, n_trees=100, max_depth=10,
+              seed=0, keep_dir=None, verbose=False):
+    """
+    합성 발전소 n_plants개로 파이프라인을 한 번 실행하고 측정 결과(dict)를 반환
+    """
+    rng = np.random.default_rng(seed)
+    work_dir = keep_dir or tempfile.mkdtemp(prefix=f"bench_{n_plants}_")
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        # --- 준비 (측정 제외) ---
+        location_df = make_locations(n_plants, rng)
+        responses = make_responses(n_plants, days, rng)
+        template_dir = os.path.join(work_dir, "templates")
+        os.makedirs(template_dir, exist_ok=True)
+        templates = build_template_models(template_dir, n_templates, n_trees, max_depth, rng)
+        model_dir = os.path.join(work_dir, "models")
+        link_plant_models(location_df, templates, model_dir)
+
+        # --- 측정 ---
+        metrics = RunMetrics(f"benchmark_{n_plants}")
+        registry = ModelRegistry(model_dir=model_dir)
+        log = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with log:
+            with metrics.stage("decode"):
+                frames = forecast_job.decode_responses(responses, location_df)
+            with metrics.stage("predict"):
+                frames = forecast_job.predict_all(frames, registry, workers=workers, metrics=metrics)
+            with metrics.stage("concat"):
+                final_df = pd.concat(frames, ignore_index=True)
+            with metrics.stage("write"):
+                final_df = final_df[[c for c in forecast_job.FINAL_COLUMNS if c in final_df.columns]]
+                write_forecast(
+                    final_df,
+                    os.path.join(work_dir, "forecast.csv"),
+                    os.path.join(work_dir, "forecast.parquet"),
+                )
+
+        seconds = sum(metrics.stages[s] for s in TIMED_STAGES)
+        plant_days = len(final_df)
+        peak_self, peak_children = _peak_rss_mb()
+        return {
+            "plants": n_plants,
+            "days": days,
+            "workers": workers,
+            "plant_days": plant_days,
+            "predicted": int(final_df['발전량_예측(MWh)'].notna().sum()),
+            "seconds": round(seconds, 4),
+            "plant_days_per_s": round(plant_days / seconds, 1) if seconds > 0 else None,
+            "stages": {k: round(v, 4) for k, v in metrics.stages.items()},
+            "models_loaded": registry.loads,
+            "peak_rss_mb": peak_self,
+            "peak_rss_children_mb": peak_children,
+        }
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_isolated(n_plants, **kwargs):
+    # 규모별 peak RSS가 섞이지 않도록 매번 새(spawn) 프로세스에서 실행
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        return executor.submit(run_scale, n_plants, **kwargs).result()
+
+
+def print_table(results):
+    print(f"\n{'plants':>8} {'plant-days':>11} {'seconds':>9} {'plant-days/s':>13} "
+          f"{'decode':>8} {'predict':>8} {'write':>8} {'RSS(MB)':>9}")
+    for r in results:
+        rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+        print(f"{r['plants']:>8} {r['plant_days']:>11} {r['seconds']:>9.3f} {r['plant_days_per_s']:>13,.0f} "
+              f"{r['stages']['decode']:>8.3f} {r['stages']['predict']:>8.3f} {r['stages']['write']:>8.3f} {rss:>9}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="합성 발전소로 7일 발전량 예측 파이프라인 처리량/메모리 측정")
+    parser.add_argument("--plants", type=int, nargs="+", default=list(DEFAULT_PLANTS),
+                        help="측정할 발전소 수 목록 (기본값: 100 1000 10000)")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="발전소당 예보 일수 (기본값 7)")
+    parser.add_argument("--workers", type=int, default=1, help="모델 예측 프로세스 수 (기본값 1)")
+    parser.add_argument("--templates", type=int, default=4, help="서로 다른 대체 모델 수 (기본값 4)")
+    parser.add_argument("--trees", type=int, default=100, help="대체 모델의 트리 수 (기본값 100)")
+    parser.add_argument("--max-depth", type=int, default=10, help="대체 모델의 최대 깊이 (기본값 10)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--verbose", action="store_true", help="파이프라인의 발전소별 출력도 표시")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for n_plants in args.plants:
+        print(f"⏳ 합성 발전소 {n_plants:,}개 × {args.days}일 측정 중...")
+        result = run_isolated(
+            n_plants, days=args.days, workers=args.workers, n_templates=args.templates,
+            n_trees=args.trees, max_depth=args.max_depth, seed=args.seed, verbose=args.verbose,
+        )
+        print(f"✅ {n_plants:,}개: {result['plant_days_per_s']:,.0f} plant-days/s "
+              f"(peak RSS {result['peak_rss_mb']} MB)")
+        results.append(result)
+
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 측정 결과를 '{args.output}' 파일로 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
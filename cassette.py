@@ -0,0 +1,142 @@
+# cassette.py
+# Open-Meteo / 기상청(KMA) API 응답을 로컬 디렉터리에 녹화(record)하고
+# 네트워크 없이 재생(replay)하는 세션 래퍼
+#
+# 환경변수
+#   CASSETTE_MODE        : "record" | "replay" (비어 있으면 그대로 네트워크 사용)
+#   CASSETTE_DIR         : 녹화 파일 저장 위치 (기본값 .cassettes)
+#   CASSETTE_LATENCY_MS  : 재생 시 응답마다 넣을 지연 시간(ms, 기본값 0)
+#
+# 사용 예) CASSETTE_MODE=record python 7일발전량예측api.py
+#         CASSETTE_MODE=replay CASSETTE_LATENCY_MS=120 python 7일발전량예측api.py
+
+import os
+import json
+import time
+import base64
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+DEFAULT_DIR = ".cassettes"
+
+# 녹화 파일 이름(키)과 내용에서 제외할 파라미터 (API 키 등)
+SECRET_PARAMS = {"authKey", "apikey", "api_key"}
+
+
+def _env_mode():
+    mode = os.getenv("CASSETTE_MODE", "").strip().lower()
+    if mode and mode not in (MODE_RECORD, MODE_REPLAY):
+        raise ValueError(f"CASSETTE_MODE는 'record' 또는 'replay'여야 합니다: {mode}")
+    return mode
+
+
+def request_key(method, url, params=None, data=None):
+    """
+    (메서드, URL, 파라미터)로 만든 녹화 키 (비밀 파라미터 제외, 순서 무관)
+    """
+    payload = params if params is not None else data
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items() if k not in SECRET_PARAMS}
+    raw = json.dumps([method.upper(), url, payload], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CassetteSession:
+    """
+    requests.Session과 같은 get/post/request 인터페이스를 가진 녹화/재생 세션
+    (openmeteo_requests.Client, requests 기반 스크립트에 그대로 넘길 수 있음)
+    """
+
+    def __init__(self, session=None, mode=None, directory=None, latency=None):
+        self.session = session if session is not None else requests.Session()
+        self.mode = _env_mode() if mode is None else mode
+        self.directory = directory or os.getenv("CASSETTE_DIR", DEFAULT_DIR)
+        if latency is None:
+            latency = float(os.getenv("CASSETTE_LATENCY_MS", "0")) / 1000.0
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+
+    def _path(self, method, url, params, data):
+        host = (urlsplit(url).netloc or "local").replace(":", "_")
+        return os.path.join(self.directory, host, request_key(method, url, params, data) + ".json")
+
+    # -----------------------------
+    # 녹화 / 재생
+    # -----------------------------
+    def _record(self, path, method, url, params, data, response):
+        payload = params if params is not None else data
+        if isinstance(payload, dict):
+            payload = {k: v for k, v in payload.items() if k not in SECRET_PARAMS}
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "params": payload,
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content or b"").decode("ascii"),
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.recorded += 1
+
+    def _replay(self, path, url):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ 녹화된 응답이 없습니다 (먼저 CASSETTE_MODE=record로 실행): {url}")
+
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["body"])
+        response.url = entry["url"]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+        with self._lock:
+            self.replayed += 1
+        return response
+
+    def request(self, method, url, params=None, data=None, **kwargs):
+        if not self.mode:
+            return self.session.request(method, url, params=params, data=data, **kwargs)
+
+        path = self._path(method, url, params, data)
+        if self.mode == MODE_REPLAY:
+            return self._replay(path, url)
+
+        response = self.session.request(method, url, params=params, data=data, **kwargs)
+        self._record(path, method, url, params, data, response)
+        return response
+
+    def get(self, url, params=None, **kwargs):
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        return self.request("POST", url, data=data, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def wrap(session=None):
+    """
+    CASSETTE_MODE가 설정돼 있으면 CassetteSession으로 감싸고, 아니면 세션을 그대로 반환
+    """
+    if not _env_mode():
+        return session if session is not None else requests.Session()
+    return CassetteSession(session)
@@ -0,0 +1,96 @@
+# csv_snapshot.py
+# 대시보드 입력 CSV를 처음 읽을 때 타입이 지정된 Arrow IPC(Feather v2, 무압축) 파일로 저장하고
+# 다음부터는 CSV 파싱 없이 메모리 매핑(memory map)으로 바로 읽는 스냅샷 캐시
+# - 스냅샷 키: 원본 경로 + 파일 크기 + 수정 시각(ns) + 읽기 함수 버전
+#   → 매일 커밋으로 CSV가 바뀌면 그 파일만 다시 파싱하고, 이전 스냅샷은 삭제
+# - pyarrow가 없거나 스냅샷을 읽고 쓰지 못하면 그냥 원본을 읽기 함수로 읽음
+#
+# 환경변수 (기본값)
+#   CSV_SNAPSHOT_DIR : 스냅샷 저장 위치 (.snapshots, 비우면 스냅샷 사용 안 함)
+
+import os
+import hashlib
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pyarrow 없이도 동작 (스냅샷만 건너뜀)
+    pa = None
+
+DEFAULT_DIR = ".snapshots"
+SNAPSHOT_SUFFIX = ".arrow"
+
+
+def snapshot_dir():
+    return os.getenv("CSV_SNAPSHOT_DIR", DEFAULT_DIR)
+
+
+def snapshot_path(path, version="", directory=None):
+    """
+    원본 경로/크기/수정 시각/버전 → 스냅샷 파일 경로 ({원본 이름}-{키 16자리}.arrow)
+    원본이 없으면 FileNotFoundError
+    """
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{version}"
+    key = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(directory or snapshot_dir(), f"{stem}-{key}{SNAPSHOT_SUFFIX}")
+
+
+def _read_snapshot(path):
+    # 메모리 매핑으로 열어 숫자/날짜 컬럼은 가능한 한 복사 없이 DataFrame으로 변환
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_snapshot(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _remove_stale(path):
+    # 같은 원본의 이전 스냅샷 삭제 (이름 앞부분 '{원본 이름}-'가 같고 키가 다른 파일)
+    directory = os.path.dirname(path)
+    prefix = os.path.basename(path).rsplit("-", 1)[0] + "-"
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(SNAPSHOT_SUFFIX) and name != os.path.basename(path):
+            if len(name) == len(os.path.basename(path)):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+def load(path, reader, version=""):
+    """
+    reader(path)가 만드는 DataFrame을 스냅샷으로 캐시해 반환
+    version: reader의 파싱 방식이 바뀌면 함께 바꿔 이전 스냅샷을 무효화
+    (원본이 없으면 reader와 같은 FileNotFoundError, 파싱 오류도 reader 그대로 전달)
+    """
+    directory = snapshot_dir()
+    if pa is None or not directory:
+        return reader(path)
+
+    snap = snapshot_path(path, version, directory)
+    if os.path.exists(snap):
+        try:
+            return _read_snapshot(snap)
+        except Exception as e:
+            print(f"⚠️ 스냅샷 '{snap}'을(를) 읽지 못해 원본 CSV를 다시 읽습니다: {e}")
+
+    df = reader(path)
+    try:
+        _write_snapshot(df, snap)
+        _remove_stale(snap)
+    except Exception as e:
+        print(f"⚠️ 스냅샷 '{snap}' 저장 실패 (원본 CSV로 계속): {e}")
+    return df
@@ -0,0 +1,190 @@
+# forecast_store.py
+# 7일 발전량 예측 결과 저장/재사용 유틸리티
+# - (발전기명, 날짜)별 입력 지문(해시)을 예측 파일 옆에 저장하고
+#   다음 실행에서 입력이 바뀐 행만 다시 예측하도록 이전 값을 넘겨줌
+# - CSV와 함께 타입이 지정된 Parquet(컬럼 기반) 파일을 원자적으로 저장하고
+#   대시보드(web_utils.load_data)는 Parquet가 있으면 그것을 먼저 읽음
+
+import os
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from model_registry import QUANTILE_COLUMNS, feature_matrix
+from schema import FLOAT32_COLUMNS
+
+FORECAST_CSV = "최종_일별_발전량_예측.csv"
+FORECAST_PARQUET = "최종_일별_발전량_예측.parquet"
+FINGERPRINT_FILENAME = "최종_일별_발전량_예측_지문.csv"
+FINGERPRINT_COLUMN = "입력해시"
+KEY_COLUMNS = ['발전기명', '날짜']
+PREDICTION_COLUMNS = ['발전량_예측(MWh)', *QUANTILE_COLUMNS]
+
+
+def _date_key(values):
+    # 날짜(date/Timestamp/문자열)를 'YYYY-MM-DD' 문자열로 통일
+    return pd.to_datetime(pd.Series(values)).dt.strftime('%Y-%m-%d').to_numpy()
+
+
+def _day_key(day):
+    # 행 하나의 날짜 → 'YYYY-MM-DD' (date/Timestamp는 바로 포맷, 문자열만 파싱)
+    return pd.Timestamp(day).strftime('%Y-%m-%d') if isinstance(day, str) else f"{day:%Y-%m-%d}"
+
+
+def compute_fingerprints(features, model_version=""):
+    """
+    모델 입력 배열(model_registry.feature_matrix) 한 행마다 64비트 해시를 16진수 문자열로 반환
+    (모델 파일이 바뀌면 모든 해시가 달라지도록 model_version을 키로 사용)
+    DataFrame을 넘기면 먼저 feature_matrix로 변환
+    """
+    X = np.ascontiguousarray(feature_matrix(features))
+    key = hashlib.sha1(model_version.encode("utf-8")).digest()
+    return np.array([hashlib.blake2b(row.tobytes(), digest_size=8, key=key).hexdigest() for row in X],
+                    dtype=object)
+
+
+def load_previous_forecast(output_path, fingerprint_path=FINGERPRINT_FILENAME):
+    """
+    이전 실행의 예측값과 입력 지문을 (발전기명, 날짜) 인덱스로 합쳐 반환
+    (파일이 없거나 읽을 수 없으면 빈 DataFrame)
+    """
+    if not (os.path.exists(output_path) and os.path.exists(fingerprint_path)):
+        return pd.DataFrame()
+
+    try:
+        # 이전 예측값을 그대로 옮기므로 부동소수점 값이 정확히 복원되도록 읽음
+        prev = pd.read_csv(output_path, float_precision='round_trip')
+        hashes = pd.read_csv(fingerprint_path, dtype={FINGERPRINT_COLUMN: str})
+    except Exception as e:
+        print(f"⚠️ 이전 예측 파일을 읽지 못해 전체를 다시 예측합니다: {e}")
+        return pd.DataFrame()
+
+    pred_cols = [c for c in PREDICTION_COLUMNS if c in prev.columns]
+    prev = prev[KEY_COLUMNS + pred_cols].copy()
+    for df in (prev, hashes):
+        df['날짜'] = _date_key(df['날짜'])
+
+    merged = prev.merge(hashes[KEY_COLUMNS + [FINGERPRINT_COLUMN]], on=KEY_COLUMNS, how='inner')
+    merged = merged.dropna(subset=['발전량_예측(MWh)'])
+    return merged.drop_duplicates(subset=KEY_COLUMNS).set_index(KEY_COLUMNS)
+
+
+def previous_lookup(previous):
+    """
+    load_previous_forecast 결과 → {(발전기명, 'YYYY-MM-DD'): (입력 지문, 예측값 배열)}
+    (실행마다 한 번 만들어 두고 발전소별 carry_over_predictions에서 사전 조회만 함)
+    """
+    if previous is None or len(previous) == 0:
+        return {}
+    values = np.column_stack([
+        previous[col].to_numpy(dtype=np.float64) if col in previous.columns
+        else np.full(len(previous), np.nan)
+        for col in PREDICTION_COLUMNS
+    ])
+    return {key: (fingerprint, row) for key, fingerprint, row in
+            zip(previous.index, previous[FINGERPRINT_COLUMN].to_numpy(), values)}
+
+
+def carry_over_predictions(daily_df, lookup, fingerprints):
+    """
+    입력 지문이 이전 실행과 같은 행은 이전 예측값을 가져오고
+    (예측값 배열 (n_rows, len(PREDICTION_COLUMNS)), 다시 예측해야 하는 행의 bool 배열)을 반환
+    lookup: previous_lookup 결과, fingerprints: daily_df 행 순서의 compute_fingerprints 결과
+    """
+    n_rows = len(daily_df)
+    values = np.full((n_rows, len(PREDICTION_COLUMNS)), np.nan)
+    changed = np.ones(n_rows, dtype=bool)
+
+    if lookup:
+        for i, (name, day, fingerprint) in enumerate(zip(daily_df['발전기명'], daily_df['날짜'], fingerprints)):
+            hit = lookup.get((name, _day_key(day)))
+            if hit is not None and hit[0] == fingerprint:
+                values[i] = hit[1]
+                changed[i] = False
+    return values, changed
+
+
+def attach_predictions(daily_df, values, fingerprints=None):
+    """
+    예측값 배열(과 입력 지문)을 컬럼으로 붙인 새 DataFrame (컬럼을 하나씩 추가하지 않고 한 번에 합침)
+    """
+    extra = pd.DataFrame(values, columns=PREDICTION_COLUMNS, index=daily_df.index)
+    if fingerprints is not None:
+        extra.insert(0, FINGERPRINT_COLUMN, fingerprints)
+    existing = [c for c in extra.columns if c in daily_df.columns]
+    return pd.concat([daily_df.drop(columns=existing), extra], axis=1)
+
+
+def save_fingerprints(final_df, fingerprint_path=FINGERPRINT_FILENAME):
+    if FINGERPRINT_COLUMN not in final_df.columns:
+        return
+    out = final_df[KEY_COLUMNS + [FINGERPRINT_COLUMN]].dropna(subset=[FINGERPRINT_COLUMN]).copy()
+    out['날짜'] = _date_key(out['날짜'])
+    out.to_csv(fingerprint_path, index=False, encoding='utf-8-sig')
+
+
+# -----------------------------
+# 예측 파일 저장 / 로드 (CSV + Parquet)
+# -----------------------------
+def _atomic_write(path, write):
+    # 같은 디렉터리의 임시 파일에 쓴 뒤 교체 → 읽는 쪽이 반쯤 쓰인 파일을 보지 않음
+    tmp_path = f"{path}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def to_columnar(final_df):
+    """
+    날짜는 timestamp, 발전기명은 category(사전 인코딩), 기상 변수는 float32,
+    예측값/설비용량/위경도처럼 합산·표시에 쓰는 값은 float64로 변환 (schema.py 기준)
+    """
+    df = final_df.copy()
+    if '날짜' in df.columns:
+        df['날짜'] = pd.to_datetime(df['날짜']).dt.tz_localize(None)
+    if '발전기명' in df.columns:
+        df['발전기명'] = df['발전기명'].astype('category')
+    for col in df.columns:
+        if col in ('날짜', '발전기명'):
+            continue
+        dtype = 'float32' if col in FLOAT32_COLUMNS else 'float64'
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    return df
+
+
+def write_forecast(final_df, csv_path=FORECAST_CSV, parquet_path=FORECAST_PARQUET):
+    """
+    예측 결과를 CSV(기존 형식)와 Parquet로 원자적으로 저장
+    (pyarrow가 없으면 Parquet는 건너뜀)
+    """
+    _atomic_write(csv_path, lambda p: final_df.to_csv(p, index=False, encoding='utf-8-sig'))
+
+    if parquet_path:
+        try:
+            columnar = to_columnar(final_df)
+            _atomic_write(parquet_path, lambda p: columnar.to_parquet(p, index=False, engine='pyarrow'))
+        except ImportError as e:
+            print(f"⚠️ pyarrow가 없어 Parquet 파일은 저장하지 않습니다: {e}")
+
+
+def read_forecast(csv_path=FORECAST_CSV, parquet_path=FORECAST_PARQUET):
+    """
+    Parquet가 CSV보다 오래되지 않았으면 Parquet를, 아니면 CSV를 읽어
+    날짜를 tz 없는 datetime으로 맞춘 DataFrame 반환
+    """
+    if parquet_path and os.path.exists(parquet_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+    ):
+        try:
+            return pd.read_parquet(parquet_path, engine='pyarrow')
+        except Exception as e:
+            print(f"⚠️ Parquet 파일을 읽지 못해 CSV를 사용합니다: {e}")
+
+    df = pd.read_csv(csv_path, parse_dates=["날짜"])
+    if '날짜' in df.columns:
+        df["날짜"] = df["날짜"].dt.tz_localize(None)
+    return df
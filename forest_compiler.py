@@ -0,0 +1,499 @@
+# forest_compiler.py
+# 학습된 트리 앙상블(RandomForest / XGBoost / LightGBM)을
+# 하나의 연속된 numpy 노드 배열(feature, threshold, left, right, value)로 변환하고
+# 벡터화된 일괄 탐색으로 예측하는 모듈
+#
+# 사용 예) python forest_compiler.py models/   → models/*.pkl 옆에 .forest 생성
+
+import os
+import sys
+import json
+import glob
+
+import numpy as np
+import pandas as pd
+
+COMPILED_SUFFIX = ".forest"
+
+_MAGIC = b"FLATFOREST1\n"
+_ALIGN = 64
+
+# 결측값 처리 방식 (노드별)
+MISSING_NAN = 0       # NaN만 결측 → default_left 방향 (sklearn, XGBoost, LightGBM 'NaN')
+MISSING_AS_ZERO = 1   # NaN을 0으로 바꿔 비교 (LightGBM 'None')
+MISSING_ZERO = 2      # 0과 NaN을 결측으로 보고 default_left 방향 (LightGBM 'Zero')
+
+# LightGBM의 kZeroThreshold
+_LGBM_ZERO_THRESHOLD = 1e-35
+
+
+class FlatForest:
+    """
+    모든 트리의 노드를 하나의 배열 묶음으로 가진 예측기
+
+    - 리프 노드는 left/right가 자기 자신을 가리키므로 max_depth번 반복하면
+      모든 (트리, 행)이 리프에 도달합니다.
+    - 비교는 항상 `x <= threshold` (왼쪽) 형태로 정규화해 저장합니다.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, default_left, missing,
+                 roots, max_depth, n_features, aggregation="mean", base_score=0.0,
+                 input_dtype="float32", feature_names=None, source=""):
+        # 저장된 정수형(int16/int32)을 그대로 사용 → memmap 배열을 복사하지 않음
+        self.feature = np.asarray(feature)
+        self.threshold = np.asarray(threshold)
+        self.left = np.asarray(left)
+        self.right = np.asarray(right)
+        self.value = np.asarray(value)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.missing = np.asarray(missing, dtype=np.int8)
+        self.roots = np.asarray(roots)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.aggregation = aggregation
+        self.base_score = base_score
+        self.input_dtype = np.dtype(input_dtype)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.source = source
+        self._has_special_missing = bool((self.missing != MISSING_NAN).any())
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    # -----------------------------
+    # 예측
+    # -----------------------------
+    def _as_array(self, X):
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            X = X.to_numpy()
+        X = np.asarray(X, dtype=self.input_dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(
+                f"입력 변수 개수({X.shape[1]})가 모델 변수 개수({self.n_features})와 다릅니다."
+            )
+        return X
+
+    def apply(self, X):
+        """
+        각 (트리, 행)이 도달한 리프 노드 번호를 (n_trees, n_rows) 배열로 반환
+        """
+        X = self._as_array(X)
+        n_rows = X.shape[0]
+        # 2차원 인덱싱 대신 (행 시작 위치 + 변수 번호)로 1차원 gather
+        X_flat = X.ravel()
+        row_start = (np.arange(n_rows) * self.n_features)[None, :]
+        node = np.repeat(self.roots[:, None].astype(np.intp), n_rows, axis=1)
+
+        if not self._has_special_missing and not np.isnan(X_flat).any():
+            # 결측값이 없으면 비교 한 번과 선택 한 번만 수행
+            for _ in range(self.max_depth):
+                x = X_flat[row_start + self.feature[node]]
+                node = np.where(x <= self.threshold[node], self.left[node], self.right[node])
+            return node
+
+        for _ in range(self.max_depth):
+            x = X_flat[row_start + self.feature[node]]
+
+            if self._has_special_missing:
+                missing = self.missing[node]
+                x = np.where(np.isnan(x) & (missing == MISSING_AS_ZERO), 0, x)
+                is_missing = np.isnan(x) | ((missing == MISSING_ZERO) & (np.abs(x) <= _LGBM_ZERO_THRESHOLD))
+            else:
+                is_missing = np.isnan(x)
+
+            go_left = np.where(is_missing, self.default_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return node
+
+    def predict_per_tree(self, X):
+        """
+        트리별 예측값을 (n_trees, n_rows) 배열로 반환 (한 번의 벡터화 탐색)
+        """
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        return self.aggregate(self.predict_per_tree(X))
+
+    def aggregate(self, per_tree):
+        """
+        predict_per_tree 결과를 모델 방식(평균/누적합)대로 합쳐 최종 예측값으로 변환
+        """
+        # 트리 순서(0 → N)대로 한 그루씩 더함
+        # (np.add.reduce(axis=0)는 입력이 1행이면 연속 메모리라 pairwise 합산으로 바뀌어
+        #  sklearn과 마지막 자리가 달라짐 → 행 수와 상관없이 순차 누적)
+        if self.aggregation == "mean":
+            # sklearn과 같게 0에서 시작해 누적한 뒤 트리 수로 나눔
+            out = per_tree[0].copy()
+            for tree_values in per_tree[1:]:
+                out += tree_values
+            return out / self.n_trees
+
+        # 부스팅 모델: base_score에서 시작해 트리 순서대로 누적
+        out = np.full(per_tree.shape[1], self.base_score, dtype=per_tree.dtype)
+        for tree_values in per_tree:
+            out += tree_values
+        return out
+
+    # -----------------------------
+    # 저장 / 로드
+    # -----------------------------
+    def save(self, path):
+        """
+        [매직 + 헤더 길이 + JSON 헤더 + 64바이트 정렬된 원시 배열] 형식의 단일 파일로 저장
+        (로드 시 압축 해제/역직렬화 없이 memmap으로 바로 사용)
+        """
+        index_dtype = np.int16 if self.n_nodes < np.iinfo(np.int16).max else np.int32
+        feature_dtype = np.int16 if self.n_features < np.iinfo(np.int16).max else np.int32
+        arrays = {
+            "feature": self.feature.astype(feature_dtype),
+            "threshold": self.threshold,
+            "left": self.left.astype(index_dtype),
+            "right": self.right.astype(index_dtype),
+            "value": self.value,
+            "default_left": self.default_left,
+            "missing": self.missing,
+            "roots": self.roots,
+        }
+
+        specs = {}
+        offset = 0
+        for name, arr in arrays.items():
+            offset = -(-offset // _ALIGN) * _ALIGN
+            specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+            offset += arr.nbytes
+
+        header = json.dumps({
+            "max_depth": self.max_depth,
+            "n_features": self.n_features,
+            "aggregation": self.aggregation,
+            "base_score": float(self.base_score),
+            "input_dtype": self.input_dtype.name,
+            "feature_names": self.feature_names,
+            "source": self.source,
+            "arrays": specs,
+        }, ensure_ascii=False).encode("utf-8")
+        data_start = -(-(len(_MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+
+        # 여러 워커가 같은 모델을 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않도록 pid를 붙임
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_MAGIC)
+                f.write(len(header).to_bytes(8, "little"))
+                f.write(header)
+                for name, arr in arrays.items():
+                    f.seek(data_start + specs[name]["offset"])
+                    f.write(np.ascontiguousarray(arr).tobytes())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"FlatForest 파일 형식이 아닙니다: {path}")
+            header_len = int.from_bytes(f.read(8), "little")
+            meta = json.loads(f.read(header_len).decode("utf-8"))
+        data_start = -(-(len(_MAGIC) + 8 + header_len) // _ALIGN) * _ALIGN
+
+        if mmap:
+            buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            buffer = np.fromfile(path, dtype=np.uint8)
+
+        arrays = {}
+        for name, spec in meta["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            start = data_start + spec["offset"]
+            arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+        base_score = meta["base_score"]
+        if meta["aggregation"] != "mean":
+            base_score = arrays["value"].dtype.type(base_score)
+        return cls(
+            **arrays,
+            max_depth=meta["max_depth"],
+            n_features=meta["n_features"],
+            aggregation=meta["aggregation"],
+            base_score=base_score,
+            input_dtype=meta["input_dtype"],
+            feature_names=meta["feature_names"],
+            source=meta.get("source", ""),
+        )
+
+
+# -----------------------------
+# 트리별 노드 배열 → 하나의 FlatForest로 합치기
+# -----------------------------
+def _tree_depth(left, right, root=0):
+    depth = 0
+    frontier = [root]
+    while frontier:
+        children = [c for n in frontier for c in (left[n], right[n]) if c != n]
+        if not children:
+            break
+        depth += 1
+        frontier = children
+    return depth
+
+
+def _concat_trees(trees, n_features, value_dtype, **kwargs):
+    """
+    trees: [(feature, threshold, left, right, value, default_left, missing), ...]
+    (각 트리의 left/right는 트리 내부 번호, 리프는 -1)
+    """
+    parts = {k: [] for k in ("feature", "threshold", "left", "right", "value", "default_left", "missing")}
+    roots = []
+    offset = 0
+    max_depth = 0
+
+    for feature, threshold, left, right, value, default_left, missing in trees:
+        n = len(feature)
+        idx = np.arange(n)
+        is_leaf = left < 0
+
+        # 리프는 자기 자신을 가리키게 하고 feature는 0번으로 (탐색 시 무해한 값)
+        left = np.where(is_leaf, idx, left)
+        right = np.where(is_leaf, idx, right)
+        max_depth = max(max_depth, _tree_depth(left, right))
+
+        parts["feature"].append(np.where(is_leaf, 0, feature))
+        parts["threshold"].append(np.where(is_leaf, 0.0, threshold))
+        parts["left"].append(left + offset)
+        parts["right"].append(right + offset)
+        parts["value"].append(np.asarray(value, dtype=value_dtype))
+        parts["default_left"].append(default_left)
+        parts["missing"].append(missing)
+        roots.append(offset)
+        offset += n
+
+    arrays = {k: np.concatenate(v) for k, v in parts.items()}
+    return FlatForest(roots=np.array(roots), max_depth=max_depth, n_features=n_features, **arrays, **kwargs)
+
+
+def _floor_float32(threshold):
+    """
+    float64 임계값을 float32로 내림 변환
+    (입력 x가 float32이면 x <= t64 ⇔ x <= floor32(t64) 이므로 결과가 같고 크기는 절반)
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    t32 = threshold.astype(np.float32)
+    return np.where(t32 > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+
+
+def _feature_names(model):
+    names = getattr(model, "feature_names_in_", None)
+    return [str(n) for n in names] if names is not None else None
+
+
+# -----------------------------
+# RandomForestRegressor
+# -----------------------------
+def compile_sklearn_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        t = estimator.tree_
+        if t.n_outputs != 1:
+            raise ValueError("다중 출력 트리는 지원하지 않습니다.")
+        n = t.node_count
+        missing_left = getattr(t, "missing_go_to_left", None)
+        default_left = (
+            np.asarray(missing_left, dtype=bool) if missing_left is not None else np.zeros(n, dtype=bool)
+        )
+        trees.append((
+            t.feature, _floor_float32(t.threshold), t.children_left, t.children_right,
+            t.value[:, 0, 0], default_left, np.full(n, MISSING_NAN),
+        ))
+
+    return _concat_trees(
+        trees, model.n_features_in_, np.float64,
+        aggregation="mean", input_dtype="float32",
+        feature_names=_feature_names(model), source=type(model).__name__,
+    )
+
+
+# -----------------------------
+# XGBoost (XGBRegressor / Booster)
+# -----------------------------
+def compile_xgboost(model):
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    dump = json.loads(booster.save_raw(raw_format="json"))
+    learner = dump["learner"]
+
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("gbtree 부스터만 지원합니다.")
+
+    objective = learner["objective"]["name"]
+    if objective not in ("reg:squarederror", "reg:linear", "reg:absoluteerror", "reg:pseudohubererror"):
+        raise ValueError(f"지원하지 않는 XGBoost objective입니다: {objective}")
+
+    base_score = learner["learner_model_param"]["base_score"].strip("[]")
+    base_score = np.float32(base_score)
+
+    trees = []
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        right = np.asarray(tree["right_children"], dtype=np.int64)
+        split = np.asarray(tree["split_conditions"], dtype=np.float32)
+        is_leaf = left < 0
+        # XGBoost는 x < split이면 왼쪽 → float32에서 x <= (split 바로 아래 값)과 동일
+        threshold = np.nextafter(split, np.float32(-np.inf))
+        trees.append((
+            np.asarray(tree["split_indices"]), threshold, left, right,
+            np.where(is_leaf, split, np.float32(0)),
+            np.asarray(tree["default_left"], dtype=bool),
+            np.full(len(left), MISSING_NAN),
+        ))
+
+    feature_names = booster.feature_names
+    n_features = int(learner["learner_model_param"]["num_feature"])
+    return _concat_trees(
+        trees, n_features, np.float32,
+        aggregation="sum", base_score=base_score, input_dtype="float32",
+        feature_names=feature_names, source="XGBoost",
+    )
+
+
+# -----------------------------
+# LightGBM (LGBMRegressor / Booster)
+# -----------------------------
+_LGBM_MISSING = {"None": MISSING_AS_ZERO, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+
+def _flatten_lgbm_tree(structure):
+    feature, threshold, left, right, value, default_left, missing = [], [], [], [], [], [], []
+
+    def visit(node):
+        i = len(feature)
+        for arr in (feature, threshold, left, right, value, default_left, missing):
+            arr.append(None)
+        if "leaf_value" in node:
+            feature[i], threshold[i], left[i], right[i] = 0, 0.0, -1, -1
+            value[i], default_left[i], missing[i] = node["leaf_value"], False, MISSING_NAN
+            return i
+        if node["decision_type"] != "<=":
+            raise ValueError("범주형 분할(==)이 있는 LightGBM 모델은 지원하지 않습니다.")
+        feature[i] = node["split_feature"]
+        threshold[i] = node["threshold"]
+        default_left[i] = node["default_left"]
+        missing[i] = _LGBM_MISSING[node["missing_type"]]
+        value[i] = 0.0
+        left[i] = visit(node["left_child"])
+        right[i] = visit(node["right_child"])
+        return i
+
+    visit(structure)
+    return tuple(np.asarray(a) for a in (feature, threshold, left, right, value, default_left, missing))
+
+
+def compile_lightgbm(model):
+    booster = model.booster_ if hasattr(model, "booster_") else model
+    dump = booster.dump_model()
+    if dump.get("num_tree_per_iteration", 1) != 1:
+        raise ValueError("다중 클래스 LightGBM 모델은 지원하지 않습니다.")
+
+    trees = [_flatten_lgbm_tree(t["tree_structure"]) for t in dump["tree_info"]]
+    return _concat_trees(
+        trees, dump["max_feature_idx"] + 1, np.float64,
+        aggregation="sum", base_score=np.float64(0.0), input_dtype="float64",
+        feature_names=dump.get("feature_names"), source="LightGBM",
+    )
+
+
+def compile_forest(model):
+    """
+    학습된 모델을 FlatForest로 변환 (지원하지 않는 모델이면 TypeError)
+    """
+    if isinstance(model, FlatForest):
+        return model
+
+    module = type(model).__module__
+    if module.startswith("sklearn.ensemble") and hasattr(model, "estimators_"):
+        if getattr(model, "_estimator_type", "regressor") != "regressor":
+            raise TypeError("RandomForest 회귀 모델만 지원합니다.")
+        return compile_sklearn_forest(model)
+    if module.startswith("xgboost"):
+        return compile_xgboost(model)
+    if module.startswith("lightgbm"):
+        return compile_lightgbm(model)
+    raise TypeError(f"변환할 수 없는 모델 형식입니다: {type(model).__name__}")
+
+
+def check_against(model, forest, row_counts=(7, 200), single_rows=20, seed=0):
+    """
+    원본 모델과 FlatForest의 예측이 같은지 확인 (다르면 ValueError)
+    - 입력은 각 변수의 분할 임계값 범위 안팎에서 무작위로 생성
+    - 행 수 1(시뮬레이터 단건 예측)은 우연히 같은 값이 나올 수 있으므로 single_rows번 따로 확인
+    - RandomForest(평균)는 비트 단위로 같아야 하고, 부스팅 모델은 float32 오차(1e-6)까지 허용
+    """
+    rng = np.random.default_rng(seed)
+    split = forest.left != np.arange(forest.n_nodes)
+    low = np.zeros(forest.n_features)
+    high = np.ones(forest.n_features)
+    for j in range(forest.n_features):
+        thresholds = forest.threshold[split & (forest.feature == j)]
+        if len(thresholds):
+            span = max(float(thresholds.max() - thresholds.min()), 1.0)
+            low[j], high[j] = thresholds.min() - 0.1 * span, thresholds.max() + 0.1 * span
+
+    samples = [rng.uniform(low, high, size=(1, forest.n_features)) for _ in range(single_rows)]
+    samples += [rng.uniform(low, high, size=(n_rows, forest.n_features)) for n_rows in row_counts]
+    for X in samples:
+        X = X.astype(forest.input_dtype)
+        n_rows = len(X)
+        X_input = pd.DataFrame(X, columns=forest.feature_names) if forest.feature_names else X
+        expected = np.asarray(model.predict(X_input), dtype=np.float64).ravel()
+        actual = np.asarray(forest.predict(X), dtype=np.float64)
+        if forest.aggregation == "mean":
+            same = np.array_equal(expected, actual)
+        else:
+            same = np.allclose(expected, actual, rtol=1e-6, atol=1e-6)
+        if not same:
+            diff = np.abs(expected - actual).max()
+            raise ValueError(f"변환 모델의 예측이 원본과 다릅니다 (행 {n_rows}개, 최대 차이 {diff:.3g})")
+
+
+def compiled_path(model_path):
+    return os.path.splitext(model_path)[0] + COMPILED_SUFFIX
+
+
+def compile_model_file(model_path, output_path=None):
+    """
+    .pkl 모델 파일을 읽어 원본과 예측이 같은지 확인한 뒤 같은 이름의 .forest로 저장
+    """
+    import joblib
+
+    output_path = output_path or compiled_path(model_path)
+    model = joblib.load(model_path)
+    forest = compile_forest(model)
+    check_against(model, forest)
+    return forest.save(output_path)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "models"
+    files = sorted(glob.glob(os.path.join(target, "*.pkl"))) if os.path.isdir(target) else [target]
+
+    if not files:
+        print(f"⚠️ '{target}'에서 변환할 .pkl 모델을 찾지 못했습니다.")
+
+    for model_file in files:
+        try:
+            saved = compile_model_file(model_file)
+            print(f"✅ 변환 완료: {model_file} → {saved}")
+        except Exception as e:
+            print(f"⚠️ '{model_file}' 변환 실패: {e.__class__.__name__} → {e}")
@@ -0,0 +1,155 @@
+# http_cache.py
+# Open-Meteo 요청에 쓰는 requests_cache SQLite 저장소(.cache.sqlite) 관리
+# - 세션마다 캐시 적중(hit)/미스(miss) 수를 모아 실행이 끝날 때 보고
+# - 실행이 끝나면 만료된 응답 삭제 → 크기 상한을 넘으면 오래된 응답부터 삭제
+#   → 주기(기본 24시간)마다 또는 상한을 넘었을 때 VACUUM으로 파일 크기를 실제로 줄임
+#
+# 환경변수 (기본값)
+#   HTTP_CACHE_MAX_MB        : 응답 데이터 최대 크기 MB (16)
+#   HTTP_CACHE_VACUUM_HOURS  : VACUUM 주기 시간 (24)
+
+import os
+import time
+import threading
+
+import requests_cache
+
+CACHE_NAME = ".cache"
+EXPIRE_AFTER = 3600
+DEFAULT_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "16"))
+DEFAULT_VACUUM_HOURS = float(os.getenv("HTTP_CACHE_VACUUM_HOURS", "24"))
+
+# 마지막 VACUUM 시각은 캐시 파일 안의 별도 테이블에 기록
+# (CI는 .cache.sqlite만 커밋하므로 옆에 따로 둔 파일로는 시각이 유지되지 않음)
+META_TABLE = "cache_maintenance"
+LAST_VACUUM_KEY = "last_vacuum"
+# 크기 상한을 넘으면 이 비율까지 줄임
+EVICT_TARGET = 0.8
+
+
+class CacheStats:
+    """
+    여러 스레드의 세션이 함께 쓰는 캐시 적중/미스 카운터
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, from_cache):
+        with self._lock:
+            if from_cache:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def to_dict(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None}
+
+
+class StatsCachedSession(requests_cache.CachedSession):
+    """
+    응답을 보낼 때마다 캐시에서 나왔는지(from_cache) 세어 두는 CachedSession
+    """
+
+    def __init__(self, *args, stats=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats if stats is not None else CacheStats()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.stats.record(getattr(response, "from_cache", False))
+        return response
+
+
+def make_session(stats=None, cache_name=CACHE_NAME, expire_after=EXPIRE_AFTER):
+    return StatsCachedSession(cache_name, expire_after=expire_after, stats=stats)
+
+
+def db_path(cache_name=CACHE_NAME):
+    return cache_name if cache_name.endswith(".sqlite") else f"{cache_name}.sqlite"
+
+
+def _mb(size):
+    return round(size / 1024 / 1024, 2)
+
+
+def _last_vacuum(con):
+    con.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value REAL)")
+    row = con.execute(f"SELECT value FROM {META_TABLE} WHERE key = ?", (LAST_VACUUM_KEY,)).fetchone()
+    return row[0] if row else 0.0
+
+
+def _record_vacuum(con, when):
+    con.execute(f"INSERT OR REPLACE INTO {META_TABLE} (key, value) VALUES (?, ?)", (LAST_VACUUM_KEY, when))
+
+
+def maintain(cache_name=CACHE_NAME, max_mb=DEFAULT_MAX_MB, vacuum_hours=DEFAULT_VACUUM_HOURS):
+    """
+    만료 응답 삭제 + 크기 상한 적용 + 주기적 VACUUM 후 결과를 dict로 반환 (캐시 파일이 없으면 빈 dict)
+    """
+    path = db_path(cache_name)
+    if not os.path.exists(path):
+        return {}
+
+    size_before = os.path.getsize(path)
+    backend = requests_cache.SQLiteCache(cache_name)
+    try:
+        count_before = backend.responses.count()
+        backend.delete(expired=True, vacuum=False)
+        expired = count_before - backend.responses.count()
+
+        # 크기 상한: 만료 시각이 이른(= 먼저 저장된) 응답부터 삭제 (만료 없는 응답은 맨 마지막)
+        max_bytes = int(max_mb * 1024 * 1024)
+        with backend.responses.connection() as con:
+            rows = con.execute(
+                f"SELECT key, LENGTH(value) FROM {backend.responses.table_name} "
+                f"ORDER BY expires IS NULL, expires ASC"
+            ).fetchall()
+            last_vacuum = _last_vacuum(con)
+        total = sum(size or 0 for _, size in rows)
+        evict_keys = []
+        if total > max_bytes:
+            target = max_bytes * EVICT_TARGET
+            for key, size in rows:
+                if total <= target:
+                    break
+                evict_keys.append(key)
+                total -= size or 0
+            backend.delete(*evict_keys, vacuum=False)
+
+        # 삭제만으로는 파일이 줄지 않으므로 주기가 됐거나 파일이 상한보다 크면 VACUUM
+        due = time.time() - last_vacuum >= vacuum_hours * 3600
+        vacuumed = due or ((expired or evict_keys) and os.path.getsize(path) > max_bytes)
+        if vacuumed:
+            with backend.responses.connection(commit=True) as con:
+                _record_vacuum(con, time.time())
+            backend.responses.vacuum()
+        entries = backend.responses.count()
+    finally:
+        backend.close()
+
+    return {
+        "expired_removed": expired,
+        "evicted": len(evict_keys),
+        "entries": entries,
+        "size_before_mb": _mb(size_before),
+        "size_after_mb": _mb(os.path.getsize(path)),
+        "vacuumed": bool(vacuumed),
+    }
+
+
+def report(stats, result):
+    """
+    실행 끝에 캐시 적중률과 정리 결과를 한 줄씩 출력
+    """
+    summary = stats.to_dict()
+    rate = f"{summary['hit_rate']:.0%}" if summary["hit_rate"] is not None else "-"
+    print(f"🗄️ HTTP 캐시: 적중 {summary['hits']}건 / 미스 {summary['misses']}건 (적중률 {rate})")
+    if result:
+        print(f"   만료 삭제 {result['expired_removed']}건, 용량 초과 삭제 {result['evicted']}건, "
+              f"남은 응답 {result['entries']}건, {result['size_before_mb']}MB → {result['size_after_mb']}MB"
+              f"{' (VACUUM)' if result['vacuumed'] else ''}")
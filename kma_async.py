@@ -0,0 +1,163 @@
+# kma_async.py
+# 기상청(KMA) API 요청을 asyncio로 동시에 보내는 fetcher
+# - 초당 요청 수(token bucket)와 동시 요청 수(semaphore)를 제한
+# - 요청마다 timeout, 전체 작업에는 global deadline을 적용
+# - 요청 자체는 kma_client(연결 풀/회로 차단)를 전용 스레드 풀에서 한 번씩 실행 (추가 의존성 없음)
+#   재시도는 이벤트 루프에서 직접 돌려 시도마다 토큰을 받고 제한 시간을 다시 계산
+#   → 제한 시간이 지나 버려진 스레드가 속도 제한 밖에서 재시도를 이어가지 않음
+#
+# 환경변수 (기본값)
+#   KMA_RPS          : 초당 최대 요청 수 (5)
+#   KMA_CONCURRENCY  : 동시에 진행할 최대 요청 수 (8)
+#   KMA_TIMEOUT      : 요청 1건의 timeout 초 (60)
+#   KMA_DEADLINE     : 전체 요청의 제한 시간 초 (180)
+
+import os
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import kma_client
+
+DEFAULT_RPS = float(os.getenv("KMA_RPS", "5"))
+DEFAULT_CONCURRENCY = int(os.getenv("KMA_CONCURRENCY", "8"))
+DEFAULT_TIMEOUT = float(os.getenv("KMA_TIMEOUT", "60"))
+DEFAULT_DEADLINE = float(os.getenv("KMA_DEADLINE", "180"))
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 토큰이 차는 버킷 (최대 capacity개) — acquire()는 토큰이 생길 때까지 대기
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def _fetch_one(client, url, params, bucket, semaphore, timeout, deadline_at, executor):
+    """
+    kma_client.get과 같은 재시도 규칙 (마지막 응답이 429/5xx여도 그대로 반환, 네트워크 오류는 다시 발생)
+    시도마다 토큰을 받고, 토큰 대기·한 번의 시도·재시도 대기 모두 deadline을 넘지 않음
+    """
+    loop = asyncio.get_running_loop()
+    response, error = None, None
+    async with semaphore:
+        for attempt in range(client.max_retries + 1):
+            # 토큰 대기도 deadline 안에서만 (시간이 다 되면 토큰을 쓰지 않고 포기)
+            remaining = deadline_at - time.monotonic()
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(bucket.acquire(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                if attempt == 0:
+                    raise TimeoutError("전체 제한 시간(deadline)을 넘었습니다")
+                break
+            limit = min(timeout, remaining)
+            call = functools.partial(client.send_once, url, params=params, timeout=limit)
+            try:
+                response, error, retry = await asyncio.wait_for(loop.run_in_executor(executor, call), timeout=limit)
+            except asyncio.TimeoutError:
+                # 응답을 기다리지 않고 넘어감 (스레드에는 이 한 번의 요청만 남고 재시도는 하지 않음)
+                response, error, retry = None, TimeoutError(f"요청 제한 시간 {limit:.1f}초 초과"), True
+            if not retry or attempt == client.max_retries:
+                break
+
+            delay = client.retry_delay(attempt, response)
+            if time.monotonic() + delay >= deadline_at:
+                break
+            await asyncio.sleep(delay)
+
+    if error is not None:
+        raise error
+    return response
+
+
+async def fetch_all_async(url, params_list, rps=DEFAULT_RPS, concurrency=DEFAULT_CONCURRENCY,
+                          timeout=DEFAULT_TIMEOUT, deadline=DEFAULT_DEADLINE, client=None):
+    """
+    url: 엔드포인트 이름(예: 'nph_sun_nwp_txt') 또는 전체 URL
+    params_list 순서대로 [(응답 또는 None, 오류 또는 None), ...] 반환
+    """
+    client = client or kma_client.get_client()
+    bucket = TokenBucket(rps)
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    deadline_at = time.monotonic() + deadline
+
+    if not params_list:
+        return []
+
+    # 제한 시간을 넘긴 요청 스레드를 기다리지 않도록 전용 풀을 쓰고 끝나면 wait=False로 정리
+    executor = ThreadPoolExecutor(max_workers=max(1, int(concurrency)))
+    try:
+        tasks = [
+            asyncio.ensure_future(_fetch_one(client, url, params, bucket, semaphore, timeout, deadline_at, executor))
+            for params in params_list
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"⏰ 제한 시간 {deadline:.0f}초 안에 끝나지 않은 요청 {len(pending)}건을 취소했습니다.")
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = []
+    for task in tasks:
+        if task in pending:
+            results.append((None, TimeoutError("전체 제한 시간(deadline) 초과로 취소됨")))
+        elif task.exception() is not None:
+            results.append((None, task.exception()))
+        else:
+            results.append((task.result(), None))
+    return results
+
+
+def fetch_all(url, params_list, **kwargs):
+    """
+    fetch_all_async의 동기 버전 (Streamlit처럼 이미 이벤트 루프가 돌고 있으면 별도 스레드에서 실행)
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_all_async(url, params_list, **kwargs))
+
+    box = {}
+
+    def runner():
+        try:
+            box["result"] = asyncio.run(fetch_all_async(url, params_list, **kwargs))
+        except BaseException as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
@@ -0,0 +1,169 @@
+# kma_cache.py
+# 기상청(KMA) API 응답 본문을 디스크에 저장해 재시작/다른 인스턴스에서도 재사용하는 캐시
+# - 키: (엔드포인트, 변수, 모델 실행 시각 tm, 예보 구간 tmef1~tmef2, 간격, 위도, 경도) 등 요청 파라미터 전체
+#       (authKey 같은 비밀 파라미터 제외) → SHA-256 해시가 파일 이름
+# - 같은 tm의 수치예보 결과는 바뀌지 않으므로 만료 시간 없이 보관하고,
+#   표가 정상적으로 파싱된 응답만 저장함 (아직 나오지 않은 실행/오류 응답은 저장하지 않음)
+# - 전체 크기가 상한을 넘으면 가장 오래 쓰지 않은 파일부터 삭제 (파일 수정 시각 = 마지막 사용 시각)
+#
+# 환경변수 (기본값)
+#   KMA_CACHE_DIR     : 저장 위치 (.kma_cache) — 여러 인스턴스가 같은 폴더를 공유해도 됨
+#   KMA_CACHE_MAX_MB  : 최대 크기 MB (200, 0이면 캐시 사용 안 함)
+
+import os
+import json
+import uuid
+import hashlib
+import threading
+
+from cassette import SECRET_PARAMS
+
+DEFAULT_DIR = ".kma_cache"
+DEFAULT_MAX_MB = 200.0
+
+# 크기 상한을 넘으면 이 비율까지 줄임 (저장할 때마다 정리하지 않도록 여유를 둠)
+EVICT_TARGET = 0.9
+
+
+def cache_key(endpoint, params):
+    """
+    엔드포인트 이름 + 비밀 파라미터를 뺀 요청 파라미터(순서 무관) → 64자리 16진수 키
+    위도/경도는 소수점 4자리로 맞춰 float 표기 차이로 키가 달라지지 않도록 함
+    """
+    name = str(endpoint).rstrip("/").rsplit("/", 1)[-1]
+    fields = {}
+    for key, value in (params or {}).items():
+        if key in SECRET_PARAMS:
+            continue
+        if key in ("lat", "lon"):
+            value = f"{float(value):.4f}"
+        fields[key] = str(value)
+    raw = json.dumps([name, fields], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    응답 본문(text)을 {directory}/{키 앞 2자리}/{키}.txt 로 저장하는 캐시 (스레드 안전)
+    """
+
+    def __init__(self, directory=None, max_mb=None):
+        self.directory = directory or os.getenv("KMA_CACHE_DIR", DEFAULT_DIR)
+        if max_mb is None:
+            max_mb = float(os.getenv("KMA_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._size = None          # 처음 저장할 때 폴더를 훑어 계산
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".txt")
+
+    def get(self, endpoint, params):
+        """
+        저장된 응답 본문 또는 None (읽을 때 파일 시각을 갱신해 최근 사용으로 표시)
+        """
+        if not self.enabled:
+            return None
+        path = self._path(cache_key(endpoint, params))
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            # 없는 파일이거나 다른 인스턴스가 방금 지운 경우
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, endpoint, params, text):
+        """
+        응답 본문 저장 (임시 파일에 쓴 뒤 이름 변경 → 동시에 읽는 쪽이 반쪽 파일을 보지 않음)
+        """
+        if not self.enabled or not text:
+            return
+        path = self._path(cache_key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        data = text.encode("utf-8")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            self.stored += 1
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """
+        [(경로, 크기, 수정 시각), ...] — 임시 파일 제외
+        """
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(".txt"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        # 다른 인스턴스가 쓴 파일도 포함되도록 폴더를 다시 훑어 실제 크기로 계산
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET
+        removed = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._size = total
+        self.evicted += removed
+        if removed:
+            print(f"🧹 기상청 응답 캐시 {removed}개 삭제 (현재 {total / 1024 / 1024:.1f}MB / 상한 {self.max_bytes / 1024 / 1024:.1f}MB)")
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stored": self.stored, "evicted": self.evicted}
+
+
+# 프로세스 안에서 공유하는 기본 캐시
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -0,0 +1,209 @@
+# kma_client.py
+# 기상청 API허브(apihub.kma.go.kr) 공용 클라이언트
+# - keep-alive 연결 풀을 쓰는 세션 하나를 재사용 (요청마다 TLS 핸드셰이크를 하지 않음)
+# - 429/5xx/네트워크 오류는 지터가 섞인 지수 백오프로 재시도 (429의 Retry-After 우선)
+# - 5xx/네트워크 오류가 연속으로 쌓이면 회로 차단(circuit breaker)으로 잠시 요청을 멈춤
+#
+# 환경변수 (기본값)
+#   KMA_BASE_URL      : API 기본 주소 (https://apihub.kma.go.kr/api/typ01/cgi-bin/url)
+#                       → 로컬 모의 서버로 바꿔 부하 테스트할 때 사용
+#   KMA_MAX_RETRIES   : 요청 1건의 최대 재시도 횟수 (4)
+#   KMA_BACKOFF       : 백오프 기본 초 (1.0)
+#   KMA_BACKOFF_MAX   : 백오프 최대 초 (60)
+
+import os
+import time
+import random
+import threading
+import email.utils
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import cassette
+
+DEFAULT_BASE_URL = "https://apihub.kma.go.kr/api/typ01/cgi-bin/url"
+NWP_ENDPOINT = "nph_sun_nwp_txt"          # 수치예보(KIM) 일사/기온/습도
+SAT_ENDPOINT = "nph_sun_sat_ana_txt"      # 위성 일사량 분석
+
+DEFAULT_MAX_RETRIES = int(os.getenv("KMA_MAX_RETRIES", "4"))
+DEFAULT_BACKOFF = float(os.getenv("KMA_BACKOFF", "1.0"))
+DEFAULT_BACKOFF_MAX = float(os.getenv("KMA_BACKOFF_MAX", "60"))
+DEFAULT_POOL_SIZE = 16
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 연속 실패 FAILURE_THRESHOLD번이면 COOLDOWN초 동안 요청 차단
+FAILURE_THRESHOLD = 8
+COOLDOWN = 60.0
+
+
+class CircuitOpenError(RuntimeError):
+    """회로 차단 중이라 요청을 보내지 않았음"""
+
+
+def base_url():
+    return os.getenv("KMA_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+
+
+def endpoint_url(endpoint):
+    """
+    'nph_sun_nwp_txt' 같은 엔드포인트 이름 → 전체 URL (이미 URL이면 그대로)
+    """
+    if endpoint.startswith(("http://", "https://")):
+        return endpoint
+    return f"{base_url()}/{endpoint}"
+
+
+def retry_after_seconds(response):
+    """
+    Retry-After 헤더(초 또는 HTTP 날짜)를 초로 변환 (없거나 해석할 수 없으면 None)
+    """
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    연속 실패 threshold번 → cooldown초 동안 open (요청 차단) → 한 번 시험 요청(half-open)
+    """
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # half-open: 시험 요청 하나를 보내고 결과로 닫거나 다시 연다
+                self.opened_at = None
+                self.failures = self.threshold - 1
+                return True
+            return False
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                print(f"🚧 기상청 API 연속 실패 {self.failures}회 → {self.cooldown:.0f}초 동안 요청을 멈춥니다.")
+
+
+class KMAClient:
+    """
+    스크립트/대시보드가 함께 쓰는 기상청 API 클라이언트 (스레드 안전)
+    """
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF, backoff_max=DEFAULT_BACKOFF_MAX,
+                 pool_size=DEFAULT_POOL_SIZE, breaker=None, session=None):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        # CASSETTE_MODE=record/replay이면 응답을 녹화하거나 녹화본으로 대체
+        self.session = cassette.wrap(session)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+    def send_once(self, endpoint, params=None, timeout=30):
+        """
+        재시도 없이 한 번만 요청 → (응답 또는 None, 오류 또는 None, 다시 시도할지 여부)
+        회로 차단 중이면 CircuitOpenError
+        (kma_async는 이 함수로 시도마다 속도 제한 토큰과 제한 시간을 적용)
+        """
+        url = endpoint_url(endpoint)
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"기상청 API 회로 차단 중 (연속 실패 {self.breaker.failures}회): {url}")
+
+        with self._lock:
+            self.requests += 1
+        response, error = None, None
+        try:
+            response = self.session.get(url, params=params, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            error = e
+
+        if error is None and response.status_code not in RETRY_STATUS:
+            self.breaker.record(True)
+            return response, None, False
+
+        if response is not None and response.status_code == 429:
+            # 429는 서버 장애가 아니라 속도 조절 신호 → 회로 차단 횟수에는 넣지 않음
+            with self._lock:
+                self.throttled += 1
+        else:
+            self.breaker.record(False)
+        return response, error, True
+
+    def retry_delay(self, attempt, response):
+        """
+        attempt번째 실패 후 다시 시도하기 전 기다릴 초 (재시도 횟수도 함께 셈)
+        """
+        with self._lock:
+            self.retries += 1
+        wait = retry_after_seconds(response)
+        if wait is None:
+            # full jitter: 0 ~ backoff × 2^attempt 사이 임의 시간
+            wait = random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+        return min(wait, self.backoff_max)
+
+    def get(self, endpoint, params=None, timeout=30):
+        """
+        재시도까지 마친 최종 응답을 반환 (마지막 응답이 429/5xx여도 그대로 반환)
+        네트워크 오류가 끝까지 계속되면 마지막 예외를 다시 발생시킴
+        """
+        for attempt in range(self.max_retries + 1):
+            response, error, retry = self.send_once(endpoint, params=params, timeout=timeout)
+            if not retry:
+                return response
+            if attempt == self.max_retries:
+                break
+            time.sleep(self.retry_delay(attempt, response))
+
+        if error is not None:
+            raise error
+        return response
+
+    def stats(self):
+        return {"requests": self.requests, "retries": self.retries, "throttled": self.throttled}
+
+    def close(self):
+        self.session.close()
+
+
+# 프로세스 안에서 공유하는 기본 클라이언트
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = KMAClient()
+        return _default_client
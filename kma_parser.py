@@ -0,0 +1,98 @@
+# kma_parser.py
+# 기상청 API허브의 '|' 구분 표(수치예보 nph_sun_nwp_txt, 위성 nph_sun_sat_ana_txt) 공용 파서
+# - 헤더/값 행을 배열 단위로 나누고 시간은 pd.to_datetime 한 번, 값은 pd.to_numeric 한 번으로 변환
+# - '-nan'은 NaN으로 유지하고, 숫자가 아닌 값/시간은 해당 칸만 버림 (기존 파서와 같은 동작)
+# - Wide(시간이 열) 포맷과 공백 구분 Long(시간이 행) 포맷 모두 처리
+
+import io
+
+import numpy as np
+import pandas as pd
+
+META_COLUMNS = 4          # Wide 포맷 앞쪽의 위치 정보 열 수 (시간 열은 그 뒤부터)
+NWP_TIME_FORMAT = "%Y%m%d%H"
+SAT_TIME_FORMAT = "%Y%m%d%H%M"
+KST = "Asia/Seoul"
+NAN_TOKENS = {"nan", "-nan", "NaN", "-NaN"}
+
+
+def _split_row(line):
+    cells = np.char.strip(np.array(line.strip().split("|"), dtype=str))
+    return cells[cells != ""]
+
+
+def parse_wide(text, time_format, utc_to_kst=False, value_name="값"):
+    """
+    Wide 포맷 표 → DataFrame[DATETIME, value_name] (기존 파서처럼 첫 번째 값 행만 사용)
+    표가 없거나 헤더/값 개수가 맞지 않으면 None
+    """
+    table_lines = [line for line in text.strip().splitlines() if line.strip().startswith("|")]
+    if len(table_lines) < 2:
+        return None
+
+    time_headers = _split_row(table_lines[0])[META_COLUMNS:]
+    tokens = _split_row(table_lines[1])[META_COLUMNS:]
+    if len(time_headers) == 0 or len(tokens) != len(time_headers):
+        return None
+
+    times = pd.to_datetime(time_headers, format=time_format, errors="coerce")
+    values = pd.to_numeric(pd.Series(tokens), errors="coerce").to_numpy(dtype=float)
+
+    # 숫자로 읽지 못한 값(단, nan 표기는 NaN으로 유지)과 잘못된 시간은 제외
+    keep = (~np.isnan(values) | np.isin(tokens, list(NAN_TOKENS))) & ~pd.isna(times)
+    if not keep.any():
+        return None
+
+    times = times[keep]
+    if utc_to_kst:
+        times = times.tz_localize("UTC").tz_convert(KST)
+    return pd.DataFrame({"DATETIME": times, value_name: values[keep]})
+
+
+def parse_long(text):
+    """
+    공백 구분 Long 포맷 → DataFrame ('#' 주석 줄 무시, YEAR/MON/DAY/HR/MIN이 있으면 DATETIME 생성)
+    """
+    try:
+        df = pd.read_csv(io.StringIO(text), sep=r"\s+", comment="#")
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError):
+        return None
+    if df.empty:
+        return None
+
+    date_parts = ["YEAR", "MON", "DAY", "HR", "MIN"]
+    if "DATETIME" not in df.columns and all(col in df.columns for col in date_parts):
+        df["DATETIME"] = pd.to_datetime(
+            df[date_parts].rename(columns={"YEAR": "year", "MON": "month", "DAY": "day", "HR": "hour", "MIN": "minute"}),
+            errors="coerce",
+        )
+    return df
+
+
+def parse_nwp_response(text_data, location_name, variable_name_korean):
+    """
+    수치예보(nph_sun_nwp_txt) 응답 → DataFrame[발전기명, DATETIME(KST), 변수명, 값] 또는 None
+    """
+    df = parse_wide(text_data, NWP_TIME_FORMAT, utc_to_kst=True, value_name="값")
+    if df is None:
+        return None
+    df.insert(0, "발전기명", location_name)
+    df.insert(2, "변수명", variable_name_korean)
+    return df
+
+
+def parse_sat_response(text_data, location_name):
+    """
+    위성 일사량(nph_sun_sat_ana_txt) 응답 → (DataFrame, 포맷 'wide'/'long') 또는 (None, None)
+    Wide면 [발전기명, DATETIME, SI], Long이면 원래 열 + 발전기명 (SI 열이 없으면 실패로 봄)
+    """
+    df = parse_wide(text_data, SAT_TIME_FORMAT, value_name="SI")
+    if df is not None:
+        df.insert(0, "발전기명", location_name)
+        return df, "wide"
+
+    df = parse_long(text_data)
+    if df is not None and "SI" in df.columns:
+        df["발전기명"] = location_name
+        return df, "long"
+    return None, None
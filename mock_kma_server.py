@@ -0,0 +1,309 @@
+# mock_kma_server.py
+# 기상청 API허브(nph_sun_nwp_txt, nph_sun_sat_ana_txt)를 흉내 내는 로컬 HTTP 서버
+# - 실제와 같은 '|' 구분 Wide 표를 합성 값(또는 cassette 녹화본)으로 응답
+# - 응답 지연, 오류 비율, 429(초당 요청 제한/무작위) 주입 가능 → 키/네트워크 없이 부하 테스트
+#
+# 사용 예)
+#   python mock_kma_server.py --port 8080 --latency-ms 150 --error-rate 0.02 --rps-limit 10
+#   KMA_BASE_URL=http://127.0.0.1:8080 python scripts/예측api.py
+#   python mock_kma_server.py --load-test 500 --rps-limit 20     (서버 + kma_async 부하 테스트)
+
+import os
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import cassette
+import kma_client
+
+NWP_VARIABLES = ("DSWRF", "TMP", "RH")
+
+
+# -----------------------------
+# 합성 데이터
+# -----------------------------
+def _seed(*parts):
+    return int.from_bytes(hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).digest()[:4], "little")
+
+
+def _synthetic_values(kind, times, lat, lon, utc=True):
+    """
+    위치/시간마다 항상 같은 값을 내는 합성 값 (일사는 KST 낮 시간에만 양수)
+    (수치예보 시간은 UTC, 위성 시간은 KST)
+    """
+    rng = np.random.default_rng(_seed(kind, round(lat, 3), round(lon, 3), times[0] if len(times) else ""))
+    hour_kst = ((times.hour + (9 if utc else 0)) % 24) + times.minute / 60.0
+    daylight = np.clip(np.sin((hour_kst - 6) / 12 * np.pi), 0, None)
+    if kind in ("DSWRF", "SI"):
+        scale = 800.0 if kind == "DSWRF" else 3.0
+        return daylight * scale * rng.uniform(0.4, 1.0, len(times))
+    if kind == "TMP":
+        return 273.15 + 10 + 8 * daylight + rng.normal(0, 1, len(times))
+    if kind == "RH":
+        return np.clip(70 - 25 * daylight + rng.normal(0, 5, len(times)), 5, 100)
+    return rng.uniform(0, 1, len(times))
+
+
+def wide_table(times, values, lat, lon, time_format):
+    header = ["LON", "LAT", "NX", "NY"] + [t.strftime(time_format) for t in times]
+    row = [f"{lon:.4f}", f"{lat:.4f}", "0", "0"] + [
+        "-nan" if np.isnan(v) else f"{v:.2f}" for v in values
+    ]
+    return (
+        "#START7777\n"
+        "| " + " | ".join(header) + " |\n"
+        "| " + " | ".join(row) + " |\n"
+        "#7777END\n"
+    )
+
+
+def nwp_body(params):
+    start = pd.to_datetime(params["tmef1"], format="%Y%m%d%H%M")
+    end = pd.to_datetime(params["tmef2"], format="%Y%m%d%H%M")
+    times = pd.date_range(start, end, freq=f"{int(params.get('int', 3))}h")
+    lat, lon = float(params["lat"]), float(params["lon"])
+    values = _synthetic_values(params.get("varn", "DSWRF"), times, lat, lon)
+    return wide_table(times, values, lat, lon, "%Y%m%d%H")
+
+
+def sat_body(params):
+    start = pd.to_datetime(params["tm1"], format="%Y%m%d%H%M")
+    end = pd.to_datetime(params["tm2"], format="%Y%m%d%H%M")
+    times = pd.date_range(start, end, freq=f"{int(params.get('int', 30))}min")
+    lat, lon = float(params["lat"]), float(params["lon"])
+    values = _synthetic_values("SI", times, lat, lon, utc=False)
+    return wide_table(times, values, lat, lon, "%Y%m%d%H%M")
+
+
+ENDPOINTS = {kma_client.NWP_ENDPOINT: nwp_body, kma_client.SAT_ENDPOINT: sat_body}
+
+
+def _typed(value):
+    # 쿼리 문자열 → 녹화 당시의 파라미터 타입으로 복원
+    # (스크립트는 시각 'YYYYMMDDHHMM'은 문자열, 간격은 int, 위경도는 float로 보냄)
+    if value.isdigit():
+        return value if len(value) >= 8 else int(value)
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def recorded_body(directory, endpoint, params):
+    """
+    실제 API 주소 기준으로 녹화된 cassette 응답이 있으면 (상태 코드, 본문 bytes), 없으면 None
+    """
+    url = f"{kma_client.DEFAULT_BASE_URL}/{endpoint}"
+    typed = {k: _typed(v) for k, v in params.items()}
+    host = urlsplit(url).netloc.replace(":", "_")
+    path = os.path.join(directory, host, cassette.request_key("GET", url, typed) + ".json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    return entry["status_code"], base64.b64decode(entry["body"])
+
+
+# -----------------------------
+# 서버
+# -----------------------------
+class MockConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_429=0.0, rps_limit=0.0,
+                 retry_after=1.0, recordings=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.rps_limit = rps_limit
+        self.retry_after = retry_after
+        self.recordings = recordings
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "recorded": 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def roll(self, probability):
+        with self.lock:
+            return probability > 0 and self.random.random() < probability
+
+    def over_limit(self):
+        # 1초 고정 창(fixed window)으로 초당 요청 수 제한
+        if not self.rps_limit:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            return self.window_count > self.rps_limit
+
+
+class MockKMAHandler(BaseHTTPRequestHandler):
+    config = MockConfig()
+    protocol_version = "HTTP/1.1"  # keep-alive 연결 재사용 측정
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        body = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        config = self.config
+        parts = urlsplit(self.path)
+        endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1]
+
+        if endpoint == "stats":
+            with config.lock:
+                return self._send(200, json.dumps(config.stats))
+
+        config.count("requests")
+        if endpoint not in ENDPOINTS:
+            config.count("errors")
+            return self._send(404, f"#ERROR unknown endpoint: {endpoint}\n")
+
+        if config.latency_ms or config.jitter_ms:
+            time.sleep(max(0.0, config.latency_ms + config.random.uniform(-1, 1) * config.jitter_ms) / 1000.0)
+
+        if config.over_limit() or config.roll(config.rate_429):
+            config.count("throttled")
+            return self._send(429, "Too Many Requests\n", {"Retry-After": f"{config.retry_after:g}"})
+        if config.roll(config.error_rate):
+            config.count("errors")
+            return self._send(503, "Service Unavailable\n")
+
+        params = {k: v for k, v in parse_qsl(parts.query) if k not in cassette.SECRET_PARAMS}
+        if config.recordings:
+            recorded = recorded_body(config.recordings, endpoint, params)
+            if recorded is not None:
+                config.count("recorded")
+                config.count("ok")
+                return self._send(*recorded)
+        try:
+            body = ENDPOINTS[endpoint](params)
+        except (KeyError, ValueError) as e:
+            config.count("errors")
+            return self._send(200, f"#ERROR invalid parameter: {e}\n")
+        config.count("ok")
+        return self._send(200, body)
+
+
+def start_server(host="127.0.0.1", port=0, config=None):
+    """
+    백그라운드 스레드에서 서버를 띄우고 (server, base_url) 반환 (port=0이면 빈 포트 자동 선택)
+    """
+    handler = type("ConfiguredMockKMAHandler", (MockKMAHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+# -----------------------------
+# 부하 테스트
+# -----------------------------
+def run_load_test(n_requests, config, rps=None, concurrency=None):
+    """
+    모의 서버를 띄우고 kma_async로 NWP 요청 n_requests건을 보내 처리량/429/재시도 수를 출력
+    """
+    import kma_async
+
+    server, url = start_server(config=config)
+    client = kma_client.KMAClient(backoff=0.2, backoff_max=5.0)
+    today = pd.Timestamp.now().strftime("%Y%m%d")
+    params_list = [
+        {
+            "nwp": "KIMG", "varn": NWP_VARIABLES[i % 3], "tm": today + "0000",
+            "tmef1": today + "0000", "tmef2": today + "2100", "int": 3,
+            "lat": 33.5 + (i % 50) * 0.1, "lon": 126.0 + (i // 50 % 30) * 0.1,
+        }
+        for i in range(n_requests)
+    ]
+    options = {}
+    if rps is not None:
+        options["rps"] = rps
+    if concurrency is not None:
+        options["concurrency"] = concurrency
+
+    start = time.perf_counter()
+    try:
+        results = kma_async.fetch_all(f"{url}/{kma_client.NWP_ENDPOINT}", params_list, client=client, **options)
+    finally:
+        server.shutdown()
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for response, error in results if error is None and response.status_code == 200)
+    print(f"\n📊 요청 {n_requests}건 / 성공 {ok}건 / {elapsed:.2f}초 → {ok / elapsed:.1f} req/s")
+    print(f"   서버: {config.stats}")
+    print(f"   클라이언트: {client.stats()}")
+    return {"requests": n_requests, "ok": ok, "seconds": elapsed, "server": dict(config.stats),
+            "client": client.stats()}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="기상청 API허브 모의 서버 (오프라인 부하 테스트용)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="응답마다 넣을 지연 시간(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="지연 시간의 ± 변동 폭(ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 오류를 낼 확률 (0~1)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="무작위로 429를 낼 확률 (0~1)")
+    parser.add_argument("--rps-limit", type=float, default=0.0, help="초당 허용 요청 수 (넘으면 429, 0이면 제한 없음)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 응답의 Retry-After 초")
+    parser.add_argument("--recordings", default=None,
+                        help="cassette 녹화 디렉터리 (녹화본이 있는 요청은 녹화된 응답을 그대로 반환)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--load-test", type=int, default=0, metavar="N",
+                        help="서버를 띄운 뒤 kma_async로 N건을 보내는 부하 테스트만 실행")
+    parser.add_argument("--client-rps", type=float, default=None, help="부하 테스트 클라이언트의 초당 요청 수")
+    parser.add_argument("--client-concurrency", type=int, default=None, help="부하 테스트 클라이언트의 동시 요청 수")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_429=args.rate_429, rps_limit=args.rps_limit, retry_after=args.retry_after,
+        recordings=args.recordings, seed=args.seed,
+    )
+
+    if args.load_test:
+        run_load_test(args.load_test, config, rps=args.client_rps, concurrency=args.client_concurrency)
+        return
+
+    server, url = start_server(args.host, args.port, config)
+    print(f"🛰️ 기상청 모의 서버 실행 중: {url}  (KMA_BASE_URL={url})")
+    print(f"   지연 {args.latency_ms}ms ±{args.jitter_ms}ms / 오류 {args.error_rate:.0%} / "
+          f"429 {args.rate_429:.0%} / 초당 제한 {args.rps_limit or '없음'}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n종료. 통계: {config.stats}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
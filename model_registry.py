@@ -0,0 +1,235 @@
+# model_registry.py
+# 발전소별 예측 모델을 한 번만 로드해서 메모리에 상주시키는 레지스트리
+# (7일발전량예측api.py 배치 작업과 pages/시뮬레이터.py 대시보드가 함께 사용)
+
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from forest_compiler import FlatForest, compile_forest, compiled_path
+
+# 모델 학습에 사용된 변수 (순서 중요!)
+MODEL_FEATURES = [
+    '설비용량(MW)', '평균기온', '평균습도', '총강수량', '총적설량',
+    '평균풍속', '일조시간', '일사량', '평균운량'
+]
+
+# 예측 구간 (트리별 예측값의 분위수)
+QUANTILES = (0.1, 0.5, 0.9)
+QUANTILE_COLUMNS = ['발전량_P10(MWh)', '발전량_P50(MWh)', '발전량_P90(MWh)']
+
+MODEL_DIR = "models"
+MODEL_FILE_PATTERN = re.compile(r"^rf_full_(?P<name>.+)_step9\.(?P<ext>pkl|forest)$")
+DEFAULT_MAX_MODELS = 64
+
+
+def clean_plant_name(plant_name):
+    """
+    발전기명을 모델 파일명에 쓰이는 형태로 정리 (앞뒤/내부 공백 제거)
+    """
+    return str(plant_name).strip().replace(' ', '')
+
+
+def feature_matrix(frame):
+    """
+    예측 입력 DataFrame → MODEL_FEATURES 순서의 연속된 float32 배열 (n_rows, n_features)
+    숫자가 아닌 값/결측은 0 — 지문 계산과 모델 예측이 이 배열 하나를 함께 씀
+    (트리 모델은 내부적으로 float32로 비교하므로 예측값은 float64 입력과 같음)
+    이미 배열이면 그대로 반환
+    """
+    if isinstance(frame, np.ndarray):
+        return frame
+    values = frame[MODEL_FEATURES]
+    try:
+        X = values.to_numpy(dtype=np.float64)
+    except (TypeError, ValueError):
+        # 문자열 등이 섞인 경우에만 컬럼별 숫자 변환
+        X = values.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    X[np.isnan(X)] = 0.0
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+class ModelRegistry:
+    """
+    모델 디렉터리를 한 번만 색인하고, 발전소별 모델을 처음 요청될 때 로드해서
+    LRU 방식으로 최대 max_models개까지 메모리에 유지합니다.
+
+    같은 이름의 .forest(forest_compiler로 변환한 파일)가 .pkl보다 최신이면 그것을 로드하고,
+    .pkl만 있으면 로드 직후 FlatForest로 변환한 뒤 .pkl 옆에 .forest로 저장해
+    다음 로드부터는 변환 없이 .forest를 바로 읽습니다.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, max_models=DEFAULT_MAX_MODELS):
+        self.model_dir = model_dir
+        self.max_models = max(1, int(max_models))
+        self._paths = self._build_index()
+        self._models = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    # -----------------------------
+    # 모델 파일 색인
+    # -----------------------------
+    def _build_index(self):
+        found = {}
+        if not os.path.isdir(self.model_dir):
+            return {}
+        for file_name in os.listdir(self.model_dir):
+            match = MODEL_FILE_PATTERN.match(file_name)
+            if match:
+                found.setdefault(match.group("name"), {})[match.group("ext")] = os.path.join(self.model_dir, file_name)
+
+        paths = {}
+        for name, files in found.items():
+            pkl_path, forest_path = files.get("pkl"), files.get("forest")
+            # 변환 파일이 원본보다 오래됐으면(모델 재학습) 원본 사용
+            if forest_path and (not pkl_path or os.path.getmtime(forest_path) >= os.path.getmtime(pkl_path)):
+                paths[name] = forest_path
+            else:
+                paths[name] = pkl_path
+        return paths
+
+    def refresh(self):
+        """
+        모델 디렉터리를 다시 색인하고 상주 중인 모델을 비움 (모델 재학습 후 사용)
+        """
+        with self._lock:
+            self._paths = self._build_index()
+            self._models.clear()
+
+    def model_path(self, plant_name):
+        clean_name = clean_plant_name(plant_name)
+        return self._paths.get(
+            clean_name, os.path.join(self.model_dir, f"rf_full_{clean_name}_step9.pkl")
+        )
+
+    def has_model(self, plant_name):
+        return clean_plant_name(plant_name) in self._paths
+
+    def model_version(self, plant_name):
+        """
+        모델 파일 식별값 (원본 파일명 + 내용 SHA-256 앞 16자리) - 모델이 바뀌면 예측 재사용을 막는 데 사용
+        (크기가 같은 재학습 모델도 구분되고, git checkout으로 mtime만 바뀐 경우는 같은 값)
+        해시는 (파일 장치/inode, 크기, mtime) 단위로 기억해 같은 파일(하드 링크 포함)을 다시 읽지 않음
+        """
+        clean_name = clean_plant_name(plant_name)
+        path = self._paths.get(clean_name)
+        if path is None:
+            return ""
+        pkl_path = os.path.splitext(path)[0] + ".pkl"
+        source = pkl_path if os.path.exists(pkl_path) else path
+
+        stat = os.stat(source)
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        digest = self._versions.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(block)
+            digest = sha.hexdigest()[:16]
+            self._versions[key] = digest
+        return f"{os.path.basename(source)}:{digest}"
+
+    def plants(self):
+        return sorted(self._paths)
+
+    # -----------------------------
+    # 모델 로드 (LRU)
+    # -----------------------------
+    def get(self, plant_name):
+        """
+        발전소 모델을 반환 (처음 요청 시에만 디스크에서 로드)
+        """
+        clean_name = clean_plant_name(plant_name)
+
+        with self._lock:
+            model = self._models.get(clean_name)
+            if model is not None:
+                self._models.move_to_end(clean_name)
+                self.hits += 1
+                return model
+
+        if clean_name not in self._paths:
+            raise FileNotFoundError(f"❌ 모델 파일을 찾을 수 없습니다: {self.model_path(clean_name)}")
+
+        # 500트리 모델은 로드가 오래 걸리므로 락 밖에서 로드
+        model, path = self._load(self._paths[clean_name])
+
+        with self._lock:
+            self.loads += 1
+            self._paths[clean_name] = path
+            self._models[clean_name] = model
+            self._models.move_to_end(clean_name)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model
+
+    @staticmethod
+    def _load(path):
+        """
+        (모델, 다음부터 읽을 파일 경로) 반환
+        """
+        if path.endswith(".forest"):
+            return FlatForest.load(path), path
+        model = joblib.load(path)
+        try:
+            forest = compile_forest(model)
+        except (TypeError, ValueError):
+            # 변환할 수 없는 모델은 원래 predict 사용
+            return model, path
+
+        # 변환 결과를 저장해 두고 다음 로드(다른 워커/다음 실행)부터 재사용
+        try:
+            return forest, forest.save(compiled_path(path))
+        except OSError as e:
+            print(f"⚠️ 변환 모델 저장 실패 (메모리에서만 사용): {compiled_path(path)} → {e}")
+            return forest, path
+
+    @staticmethod
+    def _predict_model(model, X):
+        if isinstance(model, FlatForest):
+            return model.predict(X)
+        # 변환하지 못한 원본 모델은 학습 때처럼 컬럼 이름이 있는 입력으로 예측
+        return model.predict(pd.DataFrame(X, columns=MODEL_FEATURES))
+
+    def predict(self, plant_name, frame):
+        """
+        발전소 모델로 frame(MODEL_FEATURES 포함 DataFrame 또는 feature_matrix 배열)의 발전량을 예측
+        """
+        model = self.get(plant_name)
+        return self._predict_model(model, feature_matrix(frame))
+
+    def predict_with_quantiles(self, plant_name, frame, quantiles=QUANTILES):
+        """
+        점 예측값과 트리별 예측값의 분위수를 한 번의 트리 탐색으로 함께 계산
+        frame은 DataFrame 또는 feature_matrix 배열 (배열이면 다시 변환하지 않음)
+
+        반환: (점 예측 (n_rows,), 분위수 (len(quantiles), n_rows))
+        (배깅 모델이 아니라 트리별 분포가 없으면 분위수는 None)
+        """
+        model = self.get(plant_name)
+        X = feature_matrix(frame)
+
+        if not isinstance(model, FlatForest) or model.aggregation != "mean":
+            return self._predict_model(model, X), None
+
+        per_tree = model.predict_per_tree(X)
+        # 모든 트리에 대해 한 번에 분위수 계산 (트리별 파이썬 루프 없음)
+        return model.aggregate(per_tree), np.quantile(per_tree, quantiles, axis=0)
+
+    def stats(self):
+        return {
+            "indexed": len(self._paths),
+            "resident": len(self._models),
+            "loads": self.loads,
+            "hits": self.hits,
+        }
@@ -0,0 +1,76 @@
+# openmeteo_fetch.py
+# 발전소가 많을 때 Open-Meteo 요청을 여러 묶음(chunk)으로 나눠 동시에 보내는 요청 계획기
+# - 위치 목록을 chunk_size개씩 나누고, 최대 max_concurrency개 묶음을 동시에 요청
+# - 실패한 묶음만 골라 지수 백오프 후 다시 요청
+# - 응답은 원래 발전소 순서대로 다시 합침 (끝까지 실패한 발전소 자리는 None)
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF = 1.0  # 초 (재시도마다 2배)
+
+
+def plan_chunks(n_locations, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    [(시작, 끝), ...] 형태의 묶음 범위 목록 (끝은 포함하지 않음)
+    """
+    chunk_size = max(1, int(chunk_size))
+    return [(start, min(start + chunk_size, n_locations)) for start in range(0, n_locations, chunk_size)]
+
+
+def fetch_in_chunks(location_df, fetch_chunk, chunk_size=DEFAULT_CHUNK_SIZE,
+                    max_concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES,
+                    backoff=RETRY_BACKOFF, metrics=None):
+    """
+    fetch_chunk(chunk_df) → chunk_df 행 순서대로의 응답 리스트
+    반환: location_df 행 순서대로의 응답 리스트 (실패한 발전소는 None)
+    """
+    chunks = plan_chunks(len(location_df), chunk_size)
+    results = [None] * len(location_df)
+    pending = list(range(len(chunks)))
+    requests_sent = 0
+
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        if attempt:
+            wait = backoff * (2 ** (attempt - 1))
+            print(f"🔁 실패한 {len(pending)}개 묶음을 {wait:.1f}초 후 다시 요청합니다 ({attempt}/{retries})...")
+            time.sleep(wait)
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(pending)))) as executor:
+            futures = {}
+            for idx in pending:
+                start, stop = chunks[idx]
+                futures[executor.submit(fetch_chunk, location_df.iloc[start:stop])] = idx
+            requests_sent += len(futures)
+
+            for future in as_completed(futures):
+                idx = futures[future]
+                start, stop = chunks[idx]
+                try:
+                    responses = list(future.result())
+                    if len(responses) != stop - start:
+                        raise ValueError(f"응답 수({len(responses)})가 위치 수({stop - start})와 다릅니다")
+                except Exception as e:
+                    print(f"⚠️ {idx + 1}/{len(chunks)}번째 묶음(발전소 {start}~{stop - 1}) 요청 실패: "
+                          f"{e.__class__.__name__} → {e}")
+                    failed.append(idx)
+                    continue
+                results[start:stop] = responses
+
+        pending = sorted(failed)
+
+    if pending:
+        lost = sum(chunks[idx][1] - chunks[idx][0] for idx in pending)
+        print(f"❌ {len(pending)}개 묶음(발전소 {lost}곳)은 재시도 후에도 받지 못했습니다.")
+
+    if metrics is not None:
+        metrics.set("api_chunks", len(chunks))
+        metrics.set("api_requests", requests_sent)
+        metrics.set("api_failed_chunks", len(pending))
+    return results
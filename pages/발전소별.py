@@ -1,6 +1,7 @@
 # pages/발전소별.py
 import streamlit as st
 import web_utils
+from plant_index import period_bounds
 import pandas as pd
 import plotly.express as px
 from streamlit_folium import st_folium
@@ -8,8 +9,9 @@ from streamlit_folium import st_folium
 st.set_page_config(layout="wide")
 st.title("🏭 발전소별 상세 (날씨 지도 및 그래프)")
 
-# ❗️ [수정] web_utils.load_data() 호출
-df_locations, df_generation, df_region_solar, korea_geojson, df_today_forecast, df_region_solar_monthly, df_past_forecast = web_utils.load_data()
+# 이 페이지에서 쓰는 데이터셋만 불러옴
+df_locations = web_utils.load_locations()
+df_today_forecast = web_utils.load_today_forecast()
 
 # ❗️ [수정] web_utils.process_weather_data() 호출
 df_current_weather, weather_data_available = web_utils.process_weather_data(df_today_forecast, df_locations)
@@ -77,61 +79,70 @@ st.divider()
 
 st.header(f"📊 {company} 발전량 비교 (예측 vs 실제)")
 
-# 1. '실제' 발전량 데이터 준비 (df_generation)
-if company == '전체':
-    actual_data_base = pd.merge(df_generation, df_locations, on='발전기명')
-else:
-    plant_names = df_locations[df_locations['발전사'] == company]['발전기명'].tolist()
-    actual_data_base = df_generation[df_generation['발전기명'].isin(plant_names)]
+# 1. 대상 발전소 목록 (발전사 선택 → 지도 클릭 시 그 발전소 하나)
+# (발전량/과거 예측은 (발전기명, 날짜)로 정렬된 인덱스에서 이진 탐색으로 잘라 옴 — 전체 행 mask 없음)
+generation_index = web_utils.get_generation_index()
+past_forecast_index = web_utils.get_past_forecast_index()
 
-# 2. ❗️ [수정] "과거 예측" 발전량 데이터 준비 (df_past_forecast)
+# ('전체'일 때 실제 발전량은 위치 파일에 있는 발전소만, 과거 예측은 파일의 모든 발전소)
 if company == '전체':
-    past_forecast_data_base = df_past_forecast.copy()
+    plant_names = df_locations['발전기명'].tolist()
+    forecast_plant_names = None
 else:
     plant_names = df_locations[df_locations['발전사'] == company]['발전기명'].tolist()
-    past_forecast_data_base = df_past_forecast[df_past_forecast['발전기명'].isin(plant_names)]
+    forecast_plant_names = plant_names
 
-# 3. 지도 클릭 이벤트 처리
+# 2. 지도 클릭 이벤트 처리
 clicked_plant_name = map_data.get('last_object_clicked_tooltip')
 graph_title_name = company
 
 if clicked_plant_name:
-    actual_data_base = actual_data_base[actual_data_base['발전기명'] == clicked_plant_name]
-    past_forecast_data_base = past_forecast_data_base[past_forecast_data_base['발전기명'] == clicked_plant_name]
+    plant_names = [clicked_plant_name] if clicked_plant_name in plant_names else []
+    if forecast_plant_names is None or clicked_plant_name in forecast_plant_names:
+        forecast_plant_names = [clicked_plant_name]
+    else:
+        forecast_plant_names = []
     graph_title_name = clicked_plant_name
     st.subheader(f"➡️ {clicked_plant_name}")
 else:
     st.subheader("전체 발전소 합계")
 
-# 4. 사이드바 기간 필터
+# 3. 사이드바 기간 필터 (선택 목록은 선택한 발전소 구간에서만 계산)
 st.sidebar.title("기간 필터")
-actual_data_base['연도'] = actual_data_base['날짜'].dt.year
-actual_data_base['월'] = actual_data_base['날짜'].dt.month
+actual_dates = generation_index.slice(plant_names)['날짜']
 
-year_list_gen = ['전체'] + sorted(list(actual_data_base['연도'].unique()))
+year_list_gen = ['전체'] + sorted(actual_dates.dt.year.unique().tolist())
 selected_year_gen = st.sidebar.selectbox('연도를 선택하세요:', year_list_gen)
 
 if selected_year_gen == '전체':
-    month_list = ['전체'] + sorted(list(actual_data_base['월'].unique()))
-    filtered_actual = actual_data_base
+    month_list = ['전체'] + sorted(actual_dates.dt.month.unique().tolist())
 else:
-    filtered_actual = actual_data_base[actual_data_base['연도'] == selected_year_gen]
-    month_list = ['전체'] + sorted(list(filtered_actual['월'].unique()))
+    year_start, year_end = period_bounds(selected_year_gen)[0]
+    month_list = ['전체'] + sorted(generation_index.slice(plant_names, year_start, year_end)['날짜'].dt.month.unique().tolist())
 
 selected_month = st.sidebar.selectbox('월을 선택하세요:', month_list)
 
-if selected_month != '전체':
-    filtered_actual = filtered_actual[filtered_actual['월'] == selected_month]
+# 4. 선택한 기간 구간만 잘라 오기 (월만 고르면 각 연도의 그 달)
+periods = period_bounds(
+    None if selected_year_gen == '전체' else selected_year_gen,
+    None if selected_month == '전체' else selected_month,
+    years=year_list_gen[1:],
+)
+filtered_actual = generation_index.slice_periods(plant_names, periods)
+filtered_actual['연도'] = filtered_actual['날짜'].dt.year
+filtered_actual['월'] = filtered_actual['날짜'].dt.month
 
 # 5. ❗️ [수정] "과거 예측" 데이터도 동일한 기간으로 필터링
+if selected_year_gen == '전체' and selected_month != '전체':
+    # 월만 고른 경우 예측 데이터에 있는 모든 연도의 그 달
+    past_years = past_forecast_index.slice(forecast_plant_names)['날짜'].dt.year.unique().tolist()
+    past_periods = period_bounds(None, selected_month, years=past_years)
+else:
+    past_periods = periods
+past_forecast_data_base = past_forecast_index.slice_periods(forecast_plant_names, past_periods)
 if not past_forecast_data_base.empty:
     past_forecast_data_base['연도'] = past_forecast_data_base['날짜'].dt.year
     past_forecast_data_base['월'] = past_forecast_data_base['날짜'].dt.month
-    
-    if selected_year_gen != '전체':
-        past_forecast_data_base = past_forecast_data_base[past_forecast_data_base['연도'] == selected_year_gen]
-    if selected_month != '전체':
-        past_forecast_data_base = past_forecast_data_base[past_forecast_data_base['월'] == selected_month]
 else:
     st.info("해당 기간의 '과거 예측' 데이터가 없습니다.")
 
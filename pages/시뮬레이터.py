@@ -1,19 +1,13 @@
 # pages/시뮬레이터.py
 import streamlit as st
 import pandas as pd
-import joblib
 import web_utils
-import os
+from model_registry import MODEL_FEATURES
 
 st.set_page_config(layout="wide")
 st.title("⚙️ 태양광 발전량 시뮬레이터")
 
-MODEL_FEATURES = [
-    '설비용량(MW)', '평균기온', '평균습도', '총강수량', '총적설량',
-    '평균풍속', '일조시간', '일사량', '평균운량'
-]
-
-df_locations = web_utils.load_data()[0]
+df_locations = web_utils.load_locations()
 
 # --------------------------
 # 발전소 선택
@@ -49,18 +43,16 @@ with col3:
 # 예측 실행
 # --------------------------
 if st.button("📡 예측하기"):
-    clean_name = selected_plant.strip().replace(" ", "")
-    model_path = f"models/rf_full_{clean_name}_step9.pkl"
+    model_registry = web_utils.get_model_registry()
 
-    if not os.path.exists(model_path):
-        st.error(f"❌ 모델 파일을 찾을 수 없습니다: {model_path}")
+    if not model_registry.has_model(selected_plant):
+        st.error(f"❌ 모델 파일을 찾을 수 없습니다: {model_registry.model_path(selected_plant)}")
     else:
         try:
-            model = joblib.load(model_path)
             df_input = pd.DataFrame([[capacity, temp, humidity, rain, snow, wind,
                                       sunshine, solar, cloud]], columns=MODEL_FEATURES)
 
-            pred = model.predict(df_input)[0]
+            pred = model_registry.predict(selected_plant, df_input)[0]
             st.success(f"### 🔥 예측 발전량: **{pred:.2f} MWh**")
 
         except Exception as e:
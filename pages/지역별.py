@@ -7,15 +7,8 @@ import plotly.express as px
 
 st.title("🌍 지역별 태양광 발전량 분석")
 
-(
-    df_locations,
-    df_generation,
-    df_region_solar,
-    korea_geojson,
-    df_today_forecast,
-    df_region_solar_monthly,
-    df_past_forecast,
-) = web_utils.load_data()
+df_region_solar, df_region_solar_monthly = web_utils.load_region_solar()
+korea_geojson = web_utils.load_geojson()
 
 st.sidebar.title("필터")
 
@@ -0,0 +1,77 @@
+# parallel_inference.py
+# 발전소별 예측을 프로세스 풀로 나눠 실행하는 병렬 추론 단계
+# (워커마다 ModelRegistry를 하나씩 두고 모델을 상주시킴)
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from model_registry import ModelRegistry, MODEL_DIR, DEFAULT_MAX_MODELS, QUANTILES, feature_matrix
+
+# 워커 프로세스 안에서만 사용되는 레지스트리
+_worker_registry = None
+
+
+def _init_worker(model_dir, max_models):
+    global _worker_registry
+    _worker_registry = ModelRegistry(model_dir=model_dir, max_models=max_models)
+
+
+def _predict_with(registry, job):
+    """
+    (발전기명, 입력 배열, 분위수) 하나를 예측하고 (예측값, 오류 메시지)를 반환
+    (분위수를 요청하면 예측값은 (점 예측, 분위수 배열 또는 None))
+    """
+    plant_name, frame, quantiles = job
+    try:
+        if quantiles:
+            return registry.predict_with_quantiles(plant_name, frame, quantiles), None
+        return registry.predict(plant_name, frame), None
+    except Exception as e:
+        return None, f"{e.__class__.__name__} → {e}"
+
+
+def _predict_timed(registry, job):
+    # (예측값, 오류 메시지, 걸린 시간(초)) — 워커에서 잰 시간을 부모로 돌려보냄
+    start = time.perf_counter()
+    result, error = _predict_with(registry, job)
+    return result, error, time.perf_counter() - start
+
+
+def _predict_job(job):
+    return _predict_timed(_worker_registry, job)
+
+
+def run_inference(jobs, workers=1, model_dir=MODEL_DIR, max_models=DEFAULT_MAX_MODELS, registry=None,
+                  quantiles=QUANTILES, timings=None):
+    """
+    jobs: [(발전기명, DataFrame 또는 feature_matrix 배열), ...]
+    반환: jobs와 같은 순서의 [(예측값 또는 None, 오류 메시지 또는 None), ...]
+    (quantiles가 있으면 예측값은 (점 예측, 분위수 배열 또는 None))
+
+    workers가 1 이하이면 현재 프로세스에서 순서대로 예측합니다.
+    timings에 리스트를 넘기면 job별 예측 시간(초)을 같은 순서로 채웁니다.
+    """
+    # 입력 변환은 부모 프로세스에서 한 번만 (이미 배열이면 그대로, 워커에는 float32 배열만 전송)
+    quantiles = tuple(quantiles) if quantiles else None
+    jobs = [(plant_name, feature_matrix(frame), quantiles) for plant_name, frame in jobs]
+    if not jobs:
+        return []
+
+    if workers <= 1 or len(jobs) == 1:
+        registry = registry or ModelRegistry(model_dir=model_dir, max_models=max_models)
+        timed = [_predict_timed(registry, job) for job in jobs]
+    else:
+        workers = min(workers, len(jobs))
+        # 같은 워커가 연속된 발전소 묶음을 받도록 chunksize 지정 (map은 입력 순서대로 결과 반환)
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(model_dir, max_models),
+        ) as executor:
+            timed = list(executor.map(_predict_job, jobs, chunksize=chunksize))
+
+    if timings is not None:
+        timings.extend(elapsed for _, _, elapsed in timed)
+    return [(result, error) for result, error, _ in timed]
+
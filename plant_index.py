@@ -0,0 +1,121 @@
+# plant_index.py
+# (발전기명, 날짜)로 정렬해 둔 DataFrame에서 발전소/기간 구간을 이진 탐색으로 잘라 오는 인덱스
+# - 만들 때 한 번만 정렬하고, 발전소마다 시작/끝 행 위치를 기억
+# - slice()는 발전소별 행 구간 안에서 날짜를 np.searchsorted로 찾아 그 구간만 가져옴
+#   → 전체 행을 훑는 boolean mask(isin / == / 연도 == / 월 ==)와 달리 데이터 기간/발전소 수가 늘어도 일정한 속도
+
+import numpy as np
+import pandas as pd
+
+# 날짜가 없는(NaT) 행은 각 발전소 구간의 맨 뒤로 보내고 검색에서 제외
+_NAT_SORT_KEY = np.iinfo(np.int64).max
+
+
+class PlantTimeIndex:
+    """
+    df를 (plant_column, date_column) 순으로 정렬해 보관 — slice(plants, start, end)로 조회
+    """
+
+    def __init__(self, df, plant_column="발전기명", date_column="날짜"):
+        self.plant_column = plant_column
+        self.date_column = date_column
+
+        if plant_column not in df.columns or date_column not in df.columns:
+            # 빈 DataFrame(파일 없음 등)이면 조회 결과도 항상 빈 DataFrame
+            self.frame = df.reset_index(drop=True)
+            self._dates = np.empty(0, dtype=np.int64)
+            self._bounds = {}
+            return
+
+        frame = df.sort_values([plant_column, date_column], kind="mergesort", na_position="last")
+        self.frame = frame.reset_index(drop=True)
+
+        dates = pd.to_datetime(self.frame[date_column]).to_numpy(dtype="datetime64[ns]")
+        keys = dates.view("i8").copy()
+        keys[np.isnat(dates)] = _NAT_SORT_KEY
+        self._dates = keys
+
+        # 발전소 이름이 바뀌는 행 위치 → {발전기명: (시작 행, 끝 행)}
+        names = self.frame[plant_column].astype(str).to_numpy()
+        if len(names):
+            starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+            ends = np.r_[starts[1:], len(names)]
+            self._bounds = {names[s]: (int(s), int(e)) for s, e in zip(starts, ends)}
+        else:
+            self._bounds = {}
+
+    @property
+    def plants(self):
+        return list(self._bounds)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _date_key(self, value):
+        return pd.Timestamp(value).to_datetime64().astype("datetime64[ns]").view("i8")
+
+    def positions(self, plants=None, start=None, end=None):
+        """
+        조건에 맞는 행 위치 배열 (start ≤ 날짜 ≤ end, None이면 제한 없음)
+        """
+        if plants is None:
+            names = self._bounds.keys()
+        elif isinstance(plants, str):
+            names = [plants]
+        else:
+            names = list(dict.fromkeys(str(p) for p in plants))
+
+        lo_key = None if start is None else self._date_key(start)
+        hi_key = None if end is None else self._date_key(end)
+
+        ranges = []
+        for name in names:
+            bounds = self._bounds.get(name)
+            if bounds is None:
+                continue
+            lo, hi = bounds
+            # NaT 행(맨 뒤)은 기간 조건이 있으면 제외
+            if lo_key is not None or hi_key is not None:
+                hi = lo + int(np.searchsorted(self._dates[lo:hi], _NAT_SORT_KEY, side="left"))
+            if lo_key is not None:
+                lo = lo + int(np.searchsorted(self._dates[lo:hi], lo_key, side="left"))
+            if hi_key is not None:
+                hi = lo + int(np.searchsorted(self._dates[lo:hi], hi_key, side="right"))
+            if hi > lo:
+                ranges.append((lo, hi))
+
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+
+    def slice(self, plants=None, start=None, end=None):
+        """
+        발전소(이름 하나 또는 목록, None이면 전체)와 기간으로 잘라 낸 DataFrame (정렬 순서 유지)
+        """
+        return self.frame.iloc[self.positions(plants, start, end)]
+
+    def slice_periods(self, plants, periods):
+        """
+        여러 기간 [(start, end), ...]을 각각 잘라 이어 붙인 DataFrame (예: 모든 연도의 같은 달)
+        """
+        positions = [self.positions(plants, start, end) for start, end in periods]
+        if not positions:
+            return self.frame.iloc[:0]
+        return self.frame.iloc[np.concatenate(positions)]
+
+
+def period_bounds(year=None, month=None, years=()):
+    """
+    연도/월 선택 → slice_periods에 넘길 [(시작일, 끝일), ...]
+    - 연도+월: 그 달 하나, 연도만: 그 해 하나, 월만: years의 각 연도에서 그 달, 둘 다 없음: [(None, None)]
+    """
+    # 끝은 다음 구간 시작 직전(1ns 전)까지 — 날짜에 시각이 있어도 그날 전체가 포함되도록
+    if year is not None and month is not None:
+        start = pd.Timestamp(year=int(year), month=int(month), day=1)
+        return [(start, start + pd.DateOffset(months=1) - pd.Timedelta(1, "ns"))]
+    if year is not None:
+        start = pd.Timestamp(year=int(year), month=1, day=1)
+        return [(start, start + pd.DateOffset(years=1) - pd.Timedelta(1, "ns"))]
+    if month is not None:
+        return [bounds for y in sorted(years) for bounds in period_bounds(y, month)]
+    return [(None, None)]
@@ -0,0 +1,119 @@
+# run_metrics.py
+# 예측 배치 작업의 단계별 실행 시간/건수를 모아 JSON 실행 기록으로 저장
+# - 단계(stage)별 wall time, 행 수, 모델 로드/캐시 적중 수, 발전소별 예측 시간
+# - 이전 실행 기록과 비교해 크게 느려진 단계를 알려 줌
+
+import os
+import json
+import time
+import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+
+RUN_RECORD_FILENAME = "최종_일별_발전량_예측_실행기록.json"
+
+# 이전 실행보다 이 배수 이상, 그리고 최소 이 시간(초) 이상 느려지면 경고
+REGRESSION_RATIO = 1.5
+REGRESSION_MIN_SECONDS = 0.5
+
+
+class RunMetrics:
+    """
+    with metrics.stage("fetch"): ... 형태로 단계 시간을 재고,
+    count()/set()으로 건수를 기록한 뒤 write()로 JSON 저장
+    """
+
+    def __init__(self, job_name):
+        self.job_name = job_name
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._start = time.perf_counter()
+        self.stages = OrderedDict()
+        self.counters = OrderedDict()
+        self.plants = OrderedDict()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start)
+
+    def count(self, key, n=1):
+        self.counters[key] = self.counters.get(key, 0) + int(n)
+
+    def set(self, key, value):
+        self.counters[key] = value
+
+    def plant(self, plant_name, seconds=None, rows=None, status="ok"):
+        entry = {"status": status}
+        if seconds is not None:
+            entry["seconds"] = round(float(seconds), 6)
+        if rows is not None:
+            entry["rows"] = int(rows)
+        self.plants[str(plant_name)] = entry
+
+    def total_seconds(self):
+        return time.perf_counter() - self._start
+
+    def to_dict(self):
+        return {
+            "job": self.job_name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total_seconds": round(self.total_seconds(), 6),
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "plants": dict(self.plants),
+        }
+
+    # -----------------------------
+    # 저장 / 이전 실행과 비교
+    # -----------------------------
+    def find_regressions(self, previous):
+        regressions = []
+        prev_stages = (previous or {}).get("stages", {})
+        for name, seconds in self.stages.items():
+            before = prev_stages.get(name)
+            if before is None:
+                continue
+            if seconds >= before * REGRESSION_RATIO and seconds - before >= REGRESSION_MIN_SECONDS:
+                regressions.append({"stage": name, "previous": round(before, 6), "current": round(seconds, 6)})
+        return regressions
+
+    def write(self, path=RUN_RECORD_FILENAME):
+        """
+        실행 기록을 JSON으로 원자적으로 저장하고, 이전 기록 대비 느려진 단계를 출력
+        """
+        previous = load_run_record(path)
+        record = self.to_dict()
+        record["regressions"] = self.find_regressions(previous)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+        for item in record["regressions"]:
+            print(f"⚠️ '{item['stage']}' 단계가 이전 실행보다 느려졌습니다: "
+                  f"{item['previous']:.2f}s → {item['current']:.2f}s")
+        return record
+
+    def print_summary(self):
+        print("\n⏱️ 단계별 실행 시간")
+        for name, seconds in self.stages.items():
+            print(f"   - {name:<10} {seconds:8.3f}s")
+        print(f"   = 전체       {self.total_seconds():8.3f}s")
+
+
+def load_run_record(path=RUN_RECORD_FILENAME):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 이전 실행 기록을 읽지 못했습니다: {e}")
+        return None
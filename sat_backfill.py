@@ -0,0 +1,315 @@
+# sat_backfill.py
+# 위성 일사량(nph_sun_sat_ana_txt) 과거 데이터 재수집(backfill) — 중간에 끊겨도 이어서 실행 가능
+# - 기간을 (발전소, 월) 작업 단위로 나누고, 끝난 단위는 바로 파티션 파일로 저장
+#     {store}/{발전기명}/{YYYY-MM}.parquet
+# - 요청 기간과 상관없이 항상 달력 한 달 전체를 수집 (기간이 달 중간에서 시작/끝나도 파티션에 빈 날이 생기지 않음)
+#   아직 끝나지 않은 이번 달은 어제까지만 수집해 {YYYY-MM}.partial.parquet로 저장하고 매번 다시 수집
+# - 다시 실행하면 이미 저장된 단위는 건너뜀 (실패한 단위와 이번 달만 다시 요청)
+# - 여러 단위의 요청을 한 번에 kma_async.fetch_all로 보내 속도 제한(KMA_RPS) 안에서 동시에 처리
+#
+# 사용 예)
+#   python sat_backfill.py --start 20230101 --end 20241231
+#   python sat_backfill.py --start 20240101 --end 20241231 --plants 당진태양광 --output data/solar_data_2024_total.csv
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+from dotenv import load_dotenv
+
+import kma_async
+import kma_client
+import kma_parser
+
+load_dotenv()
+
+AUTH_KEY = os.getenv("MY_API_KEY")
+INTERVAL = 30
+INPUT_FILE = "data/locations_원본.csv"
+INPUT_ENCODING = "utf-8-sig"
+STORE_DIR = "data/sat_backfill"
+OUTPUT_ENCODING = "utf-8-sig"
+OUTPUT_COLUMNS = ['발전기명', 'DATETIME', 'SI']
+
+DEFAULT_UNITS_PER_BATCH = 4
+
+# 응답 1건이 최대 24개 값만 주므로 하루를 오전/오후 두 번으로 나눠 요청
+DAY_PERIODS = [("0000", "1130"), ("1200", "2330")]
+
+
+# -----------------------------------------------------------------
+# 작업 단위 (발전소, 월)
+# -----------------------------------------------------------------
+def kst_today():
+    return pd.Timestamp.now(tz='Asia/Seoul').normalize().tz_localize(None)
+
+
+def month_ranges(start_date, end_date, today=None):
+    """
+    [start_date, end_date]에 걸친 달 → [(월 'YYYY-MM', 그 달의 날짜 목록, 끝난 달 여부), ...]
+    날짜 목록은 기간과 상관없이 달력 한 달 전체 (단, 오늘 이후 날짜는 제외 → 이번 달은 미완료)
+    """
+    today = kst_today() if today is None else pd.Timestamp(today).normalize()
+    first = pd.Timestamp(start_date).to_period('M')
+    last = pd.Timestamp(end_date).to_period('M')
+
+    months = []
+    for period in pd.period_range(first, last, freq='M'):
+        month_end = period.end_time.normalize()
+        days = pd.date_range(start=period.start_time, end=min(month_end, today - pd.Timedelta(days=1)), freq='D')
+        if len(days):
+            months.append((period.strftime('%Y-%m'), list(days), month_end < today))
+    return months
+
+
+def partition_path(store_dir, plant_name, month, complete=True):
+    safe_name = str(plant_name).strip().replace('/', '_')
+    suffix = ".parquet" if complete else ".partial.parquet"
+    return os.path.join(store_dir, safe_name, f"{month}{suffix}")
+
+
+def plan_units(location_df, start_date, end_date, store_dir=STORE_DIR, today=None):
+    """
+    (발전소, 월) 작업 단위 목록과 이미 저장되어 건너뛴 단위 수를 반환
+    (끝난 달의 파티션만 건너뜀 — 이번 달의 .partial 파티션은 항상 다시 수집)
+    """
+    units, skipped = [], 0
+    months = month_ranges(start_date, end_date, today)
+    for row in location_df.itertuples():
+        name = row.발전기명.strip()
+        for month, days, complete in months:
+            path = partition_path(store_dir, name, month)
+            if os.path.exists(path):
+                skipped += 1
+                continue
+            units.append({"발전기명": name, "위도": row.위도, "경도": row.경도,
+                          "month": month, "days": days, "complete": complete,
+                          "path": path if complete else partition_path(store_dir, name, month, complete=False)})
+    return units, skipped
+
+
+def unit_params(unit):
+    params = []
+    for day in unit["days"]:
+        day_str = day.strftime('%Y%m%d')
+        for start, end in DAY_PERIODS:
+            params.append({
+                'authKey': AUTH_KEY,
+                'tm1': day_str + start,
+                'tm2': day_str + end,
+                'int': INTERVAL,
+                'lat': unit["위도"],
+                'lon': unit["경도"],
+            })
+    return params
+
+
+# -----------------------------------------------------------------
+# 응답 파싱 / 저장
+# -----------------------------------------------------------------
+def parse_result(response, error, location_name):
+    """
+    응답 1건 → (DataFrame 또는 None, 오류 메시지 또는 None)
+    데이터가 없는 정상 응답은 (None, None) — 오류가 하나라도 있으면 그 단위는 저장하지 않음
+    """
+    if error is not None:
+        return None, f"{type(error).__name__}: {error}"
+    if response.status_code != 200:
+        return None, f"HTTP {response.status_code}"
+
+    data_text = response.text.strip()
+    if data_text and not data_text.startswith("#ERROR") and not data_text.startswith("<Error>"):
+        df, fmt = kma_parser.parse_sat_response(data_text, location_name)
+        if df is None:
+            return None, f"알 수 없는 형식: {data_text[:50]}"
+        if fmt == 'long' and 'DATETIME' not in df.columns:
+            return None, "Long 포맷에 날짜 컬럼이 없음"
+        return df[OUTPUT_COLUMNS], None
+    if data_text.count('\n') < 2:
+        return None, None      # API가 빈 응답 반환 (해당 시간대 데이터 없음)
+    return None, f"API 오류: {data_text[:50]}"
+
+
+def write_partition(df, path):
+    """
+    임시 파일에 쓴 뒤 이름을 바꿔 원자적으로 저장 (저장 도중 끊겨도 불완전한 파티션이 남지 않음)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False, engine='pyarrow')
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def finish_unit(unit, results):
+    """
+    단위 하나의 응답들을 모아 저장 → 저장했으면 True, 오류가 있으면 저장하지 않고 False
+    """
+    frames, errors = [], []
+    for response, error in results:
+        df, message = parse_result(response, error, unit["발전기명"])
+        if message is not None:
+            errors.append(message)
+        elif df is not None and not df.empty:
+            frames.append(df)
+
+    if errors:
+        print(f"   ❌ {unit['발전기명']} {unit['month']}: 실패 {len(errors)}/{len(results)}건 "
+              f"(예: {errors[0]}) → 다음 실행에서 다시 시도")
+        return False
+
+    if frames:
+        unit_df = pd.concat(frames, ignore_index=True)
+        unit_df = unit_df.sort_values('DATETIME').drop_duplicates(subset=['발전기명', 'DATETIME'], keep='first')
+    else:
+        # 데이터가 없는 달도 빈 파티션으로 남겨 다시 요청하지 않도록 함
+        unit_df = pd.DataFrame({'발전기명': pd.Series(dtype=str),
+                                'DATETIME': pd.Series(dtype='datetime64[ns]'),
+                                'SI': pd.Series(dtype=float)})
+    write_partition(unit_df, unit["path"])
+    if unit["complete"]:
+        # 달이 끝나 완료 파티션을 저장했으면 이전 실행의 미완료 파티션은 삭제
+        partial_path = unit["path"][:-len(".parquet")] + ".partial.parquet"
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        print(f"   ✅ {unit['발전기명']} {unit['month']}: {len(unit_df)}건 저장")
+    else:
+        print(f"   🕒 {unit['발전기명']} {unit['month']}: {len(unit_df)}건 저장 "
+              f"(~{unit['days'][-1]:%m/%d}, 이번 달이라 다음 실행에서 다시 수집)")
+    return True
+
+
+# -----------------------------------------------------------------
+# 실행
+# -----------------------------------------------------------------
+def run_backfill(location_df, start_date, end_date, store_dir=STORE_DIR,
+                 units_per_batch=DEFAULT_UNITS_PER_BATCH, rps=kma_async.DEFAULT_RPS,
+                 concurrency=kma_async.DEFAULT_CONCURRENCY, timeout=kma_async.DEFAULT_TIMEOUT):
+    """
+    저장되지 않은 (발전소, 월) 단위만 요청해 store_dir에 저장하고 {'done', 'skipped', 'failed'} 반환
+    """
+    units, skipped = plan_units(location_df, start_date, end_date, store_dir)
+    total = len(units) + skipped
+    print(f"📦 작업 단위 {total}개 (발전소 {len(location_df)}곳 × 월) 중 완료 {skipped}개 건너뜀, {len(units)}개 수집")
+
+    done, failed = 0, 0
+    units_per_batch = max(1, int(units_per_batch))
+    for batch_start in range(0, len(units), units_per_batch):
+        batch = units[batch_start:batch_start + units_per_batch]
+        params_list, bounds = [], []
+        for unit in batch:
+            params = unit_params(unit)
+            bounds.append((len(params_list), len(params_list) + len(params)))
+            params_list.extend(params)
+
+        labels = ", ".join(f"{u['발전기명']} {u['month']}" for u in batch)
+        print(f"--- [{batch_start + 1}~{batch_start + len(batch)}/{len(units)}] {labels} (요청 {len(params_list)}건) ---")
+
+        # 배치 전체가 속도 제한 안에서 끝날 수 있도록 제한 시간을 요청 수에 맞춰 늘림
+        deadline = max(kma_async.DEFAULT_DEADLINE, 2 * len(params_list) / max(rps, 0.1) + timeout)
+        started = time.perf_counter()
+        results = kma_async.fetch_all(kma_client.SAT_ENDPOINT, params_list, rps=rps, concurrency=concurrency,
+                                      timeout=timeout, deadline=deadline)
+
+        for unit, (lo, hi) in zip(batch, bounds):
+            if finish_unit(unit, results[lo:hi]):
+                done += 1
+            else:
+                failed += 1
+        print(f"    ⏱️ {time.perf_counter() - started:.1f}초")
+
+    print(f"\n🏁 완료 {done}개 / 건너뜀 {skipped}개 / 실패 {failed}개 (저장 위치: {store_dir})")
+    if failed:
+        print("   실패한 단위는 같은 명령을 다시 실행하면 이어서 수집합니다.")
+    return {"done": done, "skipped": skipped, "failed": failed}
+
+
+def read_store(store_dir=STORE_DIR, plants=None, start_date=None, end_date=None):
+    """
+    파티션 저장소를 하나의 DataFrame[발전기명, DATETIME, SI]으로 읽기 (발전소/기간으로 필터 가능)
+    """
+    if not os.path.isdir(store_dir):
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    wanted = None if plants is None else {str(p).strip().replace('/', '_') for p in plants}
+    months = None
+    if start_date is not None and end_date is not None:
+        months = {month for month, _, _ in month_ranges(start_date, end_date)}
+
+    frames = []
+    for plant_dir in sorted(os.listdir(store_dir)):
+        if wanted is not None and plant_dir not in wanted:
+            continue
+        plant_path = os.path.join(store_dir, plant_dir)
+        if not os.path.isdir(plant_path):
+            continue
+        # 월별로 완료 파티션이 있으면 그것을, 없으면 이번 달의 미완료 파티션을 읽음
+        files = {}
+        for filename in sorted(os.listdir(plant_path)):
+            if filename.endswith('.partial.parquet'):
+                files.setdefault(filename[:-len('.partial.parquet')], filename)
+            elif filename.endswith('.parquet'):
+                files[filename[:-len('.parquet')]] = filename
+        for month, filename in sorted(files.items()):
+            if months is not None and month not in months:
+                continue
+            frames.append(pd.read_parquet(os.path.join(plant_path, filename), engine='pyarrow'))
+
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    combined = pd.concat(frames, ignore_index=True)
+    if start_date is not None and end_date is not None:
+        dates = combined['DATETIME'].dt.normalize()
+        combined = combined[(dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))]
+    return combined.sort_values(['발전기명', 'DATETIME']).reset_index(drop=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="위성 일사량 과거 데이터 재수집 (발전소×월 단위, 이어서 실행 가능)")
+    parser.add_argument("--start", required=True, help="시작 날짜 (YYYYMMDD)")
+    parser.add_argument("--end", required=True, help="끝 날짜 (YYYYMMDD)")
+    parser.add_argument("--plants", nargs="*", default=None, help="수집할 발전기명 (기본: 전체)")
+    parser.add_argument("--locations", default=INPUT_FILE, help=f"발전소 위치 파일 (기본: {INPUT_FILE})")
+    parser.add_argument("--store", default=STORE_DIR, help=f"파티션 저장 폴더 (기본: {STORE_DIR})")
+    parser.add_argument("--units-per-batch", type=int, default=DEFAULT_UNITS_PER_BATCH,
+                        help=f"한 번에 동시에 요청할 (발전소, 월) 단위 수 (기본: {DEFAULT_UNITS_PER_BATCH})")
+    parser.add_argument("--rps", type=float, default=kma_async.DEFAULT_RPS, help="초당 최대 요청 수")
+    parser.add_argument("--concurrency", type=int, default=kma_async.DEFAULT_CONCURRENCY, help="동시 요청 수")
+    parser.add_argument("--output", default=None, help="수집이 끝나면 기간 전체를 이 CSV로 합쳐 저장")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        df_locations = pd.read_csv(args.locations, encoding=INPUT_ENCODING)
+    except FileNotFoundError:
+        print(f"오류 '{args.locations}'을 찾을 수 없습니다")
+        return 1
+
+    if args.plants:
+        wanted = {p.strip() for p in args.plants}
+        df_locations = df_locations[df_locations['발전기명'].str.strip().isin(wanted)]
+        if df_locations.empty:
+            print(f"⚠️ 위치 파일에 해당 발전소가 없습니다: {', '.join(sorted(wanted))}")
+            return 1
+
+    summary = run_backfill(df_locations, args.start, args.end, store_dir=args.store,
+                           units_per_batch=args.units_per_batch, rps=args.rps, concurrency=args.concurrency)
+
+    if args.output:
+        combined = read_store(args.store, df_locations['발전기명'].str.strip(), args.start, args.end)
+        combined.to_csv(args.output, index=False, encoding=OUTPUT_ENCODING)
+        print(f"💾 {len(combined)}건을 '{args.output}'에 저장했습니다.")
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
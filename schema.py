@@ -0,0 +1,84 @@
+# schema.py
+# 대시보드/학습 데이터프레임의 표준 dtype 정의
+# - 반복되는 문자열(발전기명/발전사/지점/광역지자체) → category (코드로 비교하므로 groupby/isin도 빨라짐)
+# - 기상 입력 변수(모델 feature) → float32, 연도/월 → int16
+# - 발전량/설비용량/예측값/지역 합계처럼 합산하거나 학습 목표(target)로 쓰는 값은 float64 유지
+#   (float32로 합치면 지역/연도 합계와 학습 결과가 달라짐)
+# - 위도/경도는 격자 매칭/지도 표시 정확도를 위해 float64 유지
+# 읽을 때 apply_schema(df)만 호출하면 있는 컬럼에만 적용됨 (없는 컬럼은 무시)
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ['발전기명', '발전사', '지점', '광역지자체']
+
+# 기상 입력 변수만 float32
+FLOAT32_COLUMNS = [
+    '평균기온', '평균습도', '총강수량', '총적설량', '평균풍속', '일조시간', '일사량', '평균운량',
+    '일사량(MJ/m²)', '기온(°C)', '습도(%)',
+]
+
+FLOAT64_COLUMNS = [
+    '위도', '경도',
+    # 설비/발전량/예측값/지역 합계 (합산·학습 목표)
+    '설비용량(MW)', '발전량(MWh)', '발전량_예측(MWh)',
+    '발전량_P10(MWh)', '발전량_P50(MWh)', '발전량_P90(MWh)',
+    '태양광',
+]
+
+INT16_COLUMNS = ['연도', '월', '날씨코드']
+
+# 데이터셋별 주요 컬럼 (dtype은 위 목록을 따름)
+DATASETS = {
+    "locations": ['지점', '발전기명', '위도', '경도', '발전사', '설비용량(MW)'],
+    "generation": ['날짜', '발전기명', '설비용량(MW)', '발전량(MWh)'],
+    "region_solar": ['광역지자체', '월', '태양광', '연도'],
+    "forecast": ['날짜', '발전기명', '설비용량(MW)', '발전량_예측(MWh)', '평균기온', '평균습도', '총강수량',
+                 '총적설량', '평균풍속', '일조시간', '일사량', '평균운량', '위도', '경도'],
+    "past_forecast": ['날짜', '발전기명', '평균기온', '평균습도', '총강수량', '총적설량', '평균풍속', '일조시간',
+                      '일사량', '평균운량', '날씨코드', '위도', '경도', '설비용량(MW)', '발전량_예측(MWh)'],
+    "training": ['날짜', '발전기명', '설비용량(MW)', '발전량(MWh)', '평균기온', '평균습도', '총강수량',
+                 '총적설량', '평균풍속', '일조시간', '일사량', '평균운량'],
+}
+
+
+def column_dtype(column):
+    if column in CATEGORY_COLUMNS:
+        return "category"
+    if column in FLOAT32_COLUMNS:
+        return np.float32
+    if column in FLOAT64_COLUMNS:
+        return np.float64
+    if column in INT16_COLUMNS:
+        return np.int16
+    return None
+
+
+def apply_schema(df):
+    """
+    df의 컬럼 중 스키마에 있는 것을 표준 dtype으로 변환해 반환
+    (int16 컬럼에 결측/소수가 있으면 값을 잃지 않도록 float32로 둠)
+    """
+    converted = {}
+    for column in df.columns:
+        dtype = column_dtype(column)
+        if dtype is None or df[column].dtype == dtype:
+            continue
+        values = df[column]
+        if dtype is np.int16:
+            numeric = pd.to_numeric(values, errors="coerce")
+            if numeric.isna().any() or not (numeric == numeric.round()).all():
+                converted[column] = numeric.astype(np.float32)
+                continue
+            converted[column] = numeric.astype(np.int16)
+        elif dtype == "category":
+            converted[column] = values.astype("category")
+        else:
+            converted[column] = pd.to_numeric(values, errors="coerce").astype(dtype)
+    if not converted:
+        return df
+    return df.assign(**converted)
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
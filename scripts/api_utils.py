@@ -3,10 +3,16 @@
 import streamlit as st
 import pandas as pd
 import requests
-import time
 import datetime
 import os
+import sys
 from dotenv import load_dotenv
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))  # 루트 모듈(kma_async 등) 사용
+import weather_grid
+import kma_async
+import kma_cache
+import kma_client
+import kma_parser
 dotenv_path = os.path.join(os.path.dirname(__file__), '..', '.env')
 load_dotenv(dotenv_path=dotenv_path)
 
@@ -14,18 +20,19 @@ load_dotenv(dotenv_path=dotenv_path)
 
 # -----------------------------------------------------------------
 # ✨ 1시간 캐시가 적용된 API 호출 함수
+# (응답 원문은 kma_cache가 디스크에 보관 → 재시작/다른 인스턴스도 같은 tm은 다시 요청하지 않음)
 # -----------------------------------------------------------------
 @st.cache_data(ttl=3600)  # 3600초 = 1시간 동안 API 결과 캐시(저장)
 def get_today_forecast(df_locations_for_api):
     """
     locations.csv의 위치를 기반으로 기상청 API를 호출하여
     오늘의 3시간 단위 날씨 예보(일사, 기온, 습도)를 DataFrame으로 반환합니다.
-    (수정됨: time.sleep(0.5) 및 timeout=60 적용)
+    (요청은 kma_async로 동시에 보내고 초당 요청 수/동시 요청 수/제한 시간으로 조절)
     """
     
     # --- 1. 파라미터 설정 ---
     AUTH_KEY = os.getenv("MY_API_KEY")
-    BASE_URL = "https://apihub.kma.go.kr/api/typ01/cgi-bin/url/nph_sun_nwp_txt"
+    BASE_URL = kma_client.endpoint_url(kma_client.NWP_ENDPOINT)
     CONVERSION_FACTOR = (3 * 3600) / 1000000 
     VARIABLES_TO_FETCH = {
         "DSWRF": "일사", "TMP": "기온", "RH": "습도"
@@ -49,84 +56,72 @@ def get_today_forecast(df_locations_for_api):
         
     all_parsed_data = []
 
-    # --- 3. API 파서 함수 (UTC -> KST 변환 포함) ---
-    def parse_nwp_response(text_data, location_name, variable_name_korean):
-        try:
-            lines = text_data.strip().split('\n')
-            table_lines = [line.strip() for line in lines if line.strip().startswith('|')]
-            if len(table_lines) < 2: return None
-            header_line = table_lines[0]
-            headers = [h.strip() for h in header_line.split('|') if h.strip()]
-            data_line = table_lines[1]
-            values = [v.strip() for v in data_line.split('|') if v.strip()]
-            time_headers = headers[4:]
-            time_values = values[4:]
-            if len(time_headers) != len(time_values): return None
-            
-            parsed_data = []
-            for dt_str, val_str in zip(time_headers, time_values):
-                try:
-                    dt_utc = pd.to_datetime(dt_str, format='%Y%m%d%H').tz_localize('UTC')
-                    dt_obj = dt_utc.tz_convert('Asia/Seoul') # KST
-                    value = float(val_str.replace('-nan', 'NaN'))
-                except ValueError:
-                    continue
-                    
-                parsed_data.append({
-                    "발전기명": location_name, "DATETIME": dt_obj,
-                    "변수명": variable_name_korean, "값": value
-                })
-            return pd.DataFrame(parsed_data) if parsed_data else None
-        except Exception as e:
-            print(f"   -> [파싱 함수 오류] {location_name} ({variable_name_korean}): {e}")
-            return None
+    # --- 3. API 파서: kma_parser.parse_nwp_response (UTC -> KST 변환 포함, 공용 파서) ---
 
     # --- 4. 메인 API 요청 로직 ---
     print(f"--- '오늘({TODAY_STR})' 예측 데이터 수집 및 변환 시작 (캐시 실행) ---")
 
+    # 서로 가까운 발전소(보령/신보령 등)는 대표 좌표로 한 번만 요청하고 결과를 나눠 줌
+    cells, cell_index = weather_grid.group_by_cell(df_locations_for_api, weather_grid.KMA_NWP_GRID_DEG)
+    weather_grid.report(cells, len(df_locations_for_api), "기상청 NWP")
+
+    requests_to_send = []
+    for row in cells.itertuples():
+        for var_code, var_name_korean in VARIABLES_TO_FETCH.items():
+            for period in time_periods:
+                params = {
+                    'authKey': AUTH_KEY, 'nwp': 'KIMG', 'varn': var_code,
+                    'tm': MODEL_RUN_TIME, 'tmef1': TODAY_STR + period['start_time'],
+                    'tmef2': TODAY_STR + period['end_time'], 'int': 3, 'lat': row.위도, 'lon': row.경도
+                }
+                requests_to_send.append((row.격자, var_name_korean, params))
+
     try:
-        for row in df_locations_for_api.itertuples():
-            lat = row.위도
-            lon = row.경도
-            location_name = row.발전기명.strip()
-            
-            print(f"--- 📍'{location_name}' (위도:{lat}, 경도:{lon}) 처리 중 ---")
-    
-            for var_code, var_name_korean in VARIABLES_TO_FETCH.items():
-                for period in time_periods:
-                    forecast_start_time = TODAY_STR + period['start_time']
-                    forecast_end_time = TODAY_STR + period['end_time']
-                    
-                    params = {
-                        'authKey': AUTH_KEY, 'nwp': 'KIMG', 'varn': var_code,
-                        'tm': MODEL_RUN_TIME, 'tmef1': forecast_start_time,
-                        'tmef2': forecast_end_time, 'int': 3, 'lat': lat, 'lon': lon
-                    }
-                    try:
-                        response = requests.get(BASE_URL, params=params, timeout=60) 
-                        
-                        if response.status_code == 200:
-                            data_text = response.text.strip()
-                            if data_text and not data_text.startswith("#ERROR") and not data_text.startswith("<Error>"):
-                                df_temp = parse_nwp_response(data_text, location_name, var_name_korean)
-                                if df_temp is not None and not df_temp.empty:
-                                    all_parsed_data.append(df_temp)
-                            else:
-                                 print(f"   -> [API 응답 오류] {location_name} ({var_name_korean}): {data_text}")
-                        else:
-                             print(f"   -> [HTTP 오류] {location_name} ({var_name_korean}): 상태 코드 {response.status_code}")
-                             
-                    except requests.exceptions.Timeout:
-                        print(f"   -> [네트워크 오류] {location_name} ({var_name_korean}) 요청 시간 초과 (60초).")
-                    except Exception as e:
-                        print(f"   -> [네트워크 오류] {location_name} ({var_name_korean}): {e}")
-                    
-                    time.sleep(0.5) 
+        # 같은 모델 실행(tm)의 예보는 바뀌지 않으므로 디스크 캐시에 있는 응답은 다시 요청하지 않음
+        response_cache = kma_cache.get_cache()
+        cached_texts = [response_cache.get(kma_client.NWP_ENDPOINT, params) for _, _, params in requests_to_send]
+        missing = [i for i, text in enumerate(cached_texts) if text is None]
+        print(f"--- 📍격자 {len(cells)}개 × 변수 {len(VARIABLES_TO_FETCH)}개 × 구간 {len(time_periods)}개 "
+              f"= {len(requests_to_send)}건 (캐시 {len(requests_to_send) - len(missing)}건, 동시 요청 {len(missing)}건) ---")
+        # 연결 풀/429 재시도/회로 차단은 kma_client가 담당 (CASSETTE_MODE면 녹화/재생)
+        fetched = kma_async.fetch_all(BASE_URL, [requests_to_send[i][2] for i in missing]) if missing else []
+        results = dict(zip(missing, fetched))
+
+        for i, (location_name, var_name_korean, params) in enumerate(requests_to_send):
+            if cached_texts[i] is not None:
+                df_temp = kma_parser.parse_nwp_response(cached_texts[i], location_name, var_name_korean)
+                if df_temp is not None and not df_temp.empty:
+                    all_parsed_data.append(df_temp)
+                continue
+
+            response, error = results[i]
+            if error is not None:
+                if isinstance(error, (TimeoutError, requests.exceptions.Timeout)):
+                    print(f"   -> [네트워크 오류] {location_name} ({var_name_korean}) 요청 시간 초과.")
+                else:
+                    print(f"   -> [네트워크 오류] {location_name} ({var_name_korean}): {error}")
+                continue
+
+            if response.status_code == 200:
+                data_text = response.text.strip()
+                if data_text and not data_text.startswith("#ERROR") and not data_text.startswith("<Error>"):
+                    df_temp = kma_parser.parse_nwp_response(data_text, location_name, var_name_korean)
+                    if df_temp is not None and not df_temp.empty:
+                        all_parsed_data.append(df_temp)
+                        # 표가 정상적으로 나온 응답만 저장 (아직 생성 중인 모델 실행은 다음에 다시 요청)
+                        response_cache.put(kma_client.NWP_ENDPOINT, params, data_text)
+                else:
+                     print(f"   -> [API 응답 오류] {location_name} ({var_name_korean}): {data_text}")
+            else:
+                 print(f"   -> [HTTP 오류] {location_name} ({var_name_korean}): 상태 코드 {response.status_code}")
         
         # --- 5. [합본] 최종 변환 ---
         if all_parsed_data:
             print(f"\n--- ✨ 모든 위치 데이터 취합 및 최종 변환 시작 ---")
             final_df = pd.concat(all_parsed_data, ignore_index=True)
+            final_df = weather_grid.fan_out_frame(
+                final_df, cells, cell_index, df_locations_for_api['발전기명'].str.strip()
+            )
             
             final_pivot_df = final_df.pivot_table(
                 index=['발전기명', 'DATETIME'], columns='변수명', values='값'
@@ -1,12 +1,15 @@
 # scripts/weather.py
 import pandas as pd
 import requests
-import io
 import time
 import os
 import datetime
+import sys
 from zoneinfo import ZoneInfo # (Python 3.9+ 표준)
 from dotenv import load_dotenv
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))  # 루트 모듈(kma_client 등) 사용
+import kma_client
+import kma_parser
 
 # --- 1. 환경변수 및 경로 설정 ---
 # (GitHub Actions에서는 .env가 없어도 secrets에서 값을 읽어옴)
@@ -21,8 +24,9 @@ INPUT_ENCODING = "utf-8" # GitHub/Linux 환경은 utf-8
 OUTPUT_FILE = "data/today_forecast_3hourly_final.csv" # (★ 여기에 저장)
 OUTPUT_ENCODING = "utf-8-sig"
 
-# API 설정
-BASE_URL = "https://apihub.kma.go.kr/api/typ01/cgi-bin/url/nph_sun_sat_ana_txt"
+# API 설정 (연결 풀/429 재시도/회로 차단은 kma_client가 담당, CASSETTE_MODE면 녹화/재생)
+client = kma_client.get_client()
+BASE_URL = kma_client.endpoint_url(kma_client.SAT_ENDPOINT)
 INTERVAL = 30 # (30분 간격? 님의 코드에 있었음)
 
 # --- 2. '오늘' 날짜(KST) 동적 생성 ---
@@ -43,37 +47,7 @@ time_periods = [
 # -----------------------------
 all_dataframes = [] # (오늘 데이터만 담을 리스트)
 
-# --- 3. Wide 포맷 파싱 함수 (님이 공유해주신 코드 재사용) ---
-def parse_wide_format_response(text_data, location_name):
-    try:
-        lines = text_data.strip().split('\n')
-        table_lines = [line.strip() for line in lines if line.strip().startswith('|')]
-        if len(table_lines) < 2: return None
-        header_line = table_lines[0]
-        headers = [h.strip() for h in header_line.split('|') if h.strip()]
-        data_line = table_lines[1]
-        values = [v.strip() for v in data_line.split('|') if v.strip()]
-        time_headers = headers[4:]
-        time_values = values[4:]
-        if len(time_headers) != len(time_values): return None
-
-        parsed_data = []
-        for dt_str, si_val in zip(time_headers, time_values):
-            try:
-                dt_obj = pd.to_datetime(dt_str, format='%Y%m%d%H%M')
-                si = float(si_val.replace('-nan', 'NaN'))
-            except ValueError:
-                continue
-            parsed_data.append({
-                "발전기명": location_name,
-                "DATETIME": dt_obj,
-                "SI": si
-            })
-        if not parsed_data: return None
-        return pd.DataFrame(parsed_data)
-    except Exception as e:
-        print(f"      -> [파싱 함수 오류] {location_name}: {e}")
-        return None
+# --- 3. 응답 파싱은 kma_parser.parse_sat_response (Wide/Long 포맷 공용 파서) 사용 ---
 
 # --- 4. 메인 스크립트 실행 ---
 try:
@@ -100,36 +74,29 @@ try:
                 'lon': lon
             }
             try:
-                response = requests.get(BASE_URL, params=params, timeout=30)
+                response = client.get(BASE_URL, params=params, timeout=30)
                 if response.status_code == 200:
                     data_text = response.text.strip()
                     if data_text and not data_text.startswith("#ERROR") and not data_text.startswith("<Error>"):
-                        df_temp = parse_wide_format_response(data_text, location_name)
+                        df_temp, fmt = kma_parser.parse_sat_response(data_text, location_name)
                         if df_temp is not None and not df_temp.empty:
                             all_dataframes.append(df_temp)
-                            print(f"      -> {period['name']} 데이터 파싱 성공 (데이터 {len(df_temp)}개)")
+                            if fmt == 'long':
+                                print(f"      -> [알림] {period['name']} 'Long' 포맷 데이터 파싱 성공 (데이터 {len(df_temp)}개)")
+                            else:
+                                print(f"      -> {period['name']} 데이터 파싱 성공 (데이터 {len(df_temp)}개)")
                         else:
-                            # Long 포맷 예외 처리 (님이 공유해주신 코드)
-                            try:
-                                df_long = pd.read_csv(io.StringIO(data_text), delim_whitespace=True, comment='#')
-                                if 'SI' in df_long.columns:
-                                    print(f"      -> [알림] {period['name']} 'Long' 포맷 데이터 파싱 성공 (데이터 {len(df_long)}개)")
-                                    df_long['발전기명'] = location_name
-                                    all_dataframes.append(df_long)
-                                else:
-                                    print(f"      -> [파싱 실패] {period['name']} 응답이 알 수 없는 형식입니다: {data_text[:50]}...")
-                            except Exception:
-                                print(f"      -> [파싱 실패] {period['name']} 응답이 알 수 없는 형식입니다: {data_text[:50]}...")
+                            print(f"      -> [파싱 실패] {period['name']} 응답이 알 수 없는 형식입니다: {data_text[:50]}...")
                     elif data_text.count('\n') < 2:
                         print(f"      -> [알림] {period['name']} 데이터가 없습니다 (API가 빈 응답 반환).")
                     else:
                         print(f"      -> [API 오류] {period['name']} 응답: {data_text}")
                 elif response.status_code == 429:
-                    print(f"      -> [!!! API 트래픽 제한 감지 !!!] (HTTP 429)")
-                    print("      -> 30초간 대기 후 재시도합니다...")
-                    time.sleep(30)
+                    print(f"      -> [!!! API 트래픽 제한 감지 !!!] (HTTP 429) 재시도 후에도 제한이 풀리지 않았습니다.")
                 else:
                     print(f"      -> [HTTP 오류] {period['name']}: 상태 코드 {response.status_code}")
+            except kma_client.CircuitOpenError as e:
+                print(f"      -> [요청 중단] {period['name']}: {e}")
             except requests.exceptions.Timeout:
                 print(f"      -> [네트워크 오류] {period['name']} 요청 시간 초과 (Timeout=30s).")
             except requests.exceptions.RequestException as e:
@@ -5,6 +5,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+from src.utils.schema import apply_schema
 
 plt.rcParams['font.family'] = 'AppleGothic'
 plt.rcParams['axes.unicode_minus'] = False
@@ -156,9 +157,9 @@ def compare_ensemble_models(df_sub, gen_name):
 if __name__ == "__main__":
 
     DATA_PATH = os.path.join(BASE_DIR, "data/outliers_removed/이상치제거_데이터.csv")
-    df = pd.read_csv(DATA_PATH, encoding="utf-8-sig")
+    df = apply_schema(pd.read_csv(DATA_PATH, encoding="utf-8-sig"))
 
-    for gen_name, subset in df.groupby("발전기명"):
+    for gen_name, subset in df.groupby("발전기명", observed=True):
         if len(subset) < 30:
             print(f"⚠️ {gen_name}: 데이터 부족 → 스킵")
             continue
@@ -17,6 +17,7 @@ from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 
 from xgboost import XGBRegressor
 from lightgbm import LGBMRegressor
+from src.utils.schema import apply_schema
 
 # ---------------------------------------------------------
 # 🔧 경로 설정
@@ -39,7 +40,7 @@ PROBLEM_GENS = ["예천태양광", "고흥만수상태양광"]
 # ---------------------------------------------------------
 # 📌 데이터 로드
 # ---------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding="utf-8-sig")
+df = apply_schema(pd.read_csv(DATA_PATH, encoding="utf-8-sig"))
 df = df[df["발전량(MWh)"] != 0].copy()
 
 # ---------------------------------------------------------
@@ -188,7 +189,7 @@ def train_and_evaluate(gen_name, data):
 # ---------------------------------------------------------
 result_list = []
 
-for gen, group in df.groupby("발전기명"):
+for gen, group in df.groupby("발전기명", observed=True):
     if gen not in PROBLEM_GENS:
         continue
 
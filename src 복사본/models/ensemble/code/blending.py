@@ -10,6 +10,7 @@ from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # macOS 한글 폰트 설정
 plt.rcParams['font.family'] = 'AppleGothic'
@@ -28,7 +29,7 @@ MODEL_BASE = os.path.join(BASE_DIR, "outputs/models/ensemble/blending")
 os.makedirs(RESULT_BASE, exist_ok=True)
 os.makedirs(MODEL_BASE, exist_ok=True)
 
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 print(f"📁 전체 데이터 로드 완료: {df.shape}")
 
 
@@ -188,7 +189,7 @@ if __name__ == "__main__":
 
     metrics_all = []
 
-    for gen_name, group in df.groupby("발전기명"):
+    for gen_name, group in df.groupby("발전기명", observed=True):
 
         if len(group) < 20:
             print(f"⚠️ {gen_name}: 데이터 부족({len(group)}행) → 스킵")
@@ -11,6 +11,7 @@ from xgboost import XGBRegressor
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 import os
 import warnings
+from src.utils.schema import apply_schema
 warnings.filterwarnings("ignore")
 
 # --------------------------------------------------------------
@@ -27,7 +28,7 @@ RESULT_PATH = os.path.join(
 # --------------------------------------------------------------
 # 2️⃣ 데이터 불러오기
 # --------------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 
 # 발전량 0 제거
 df = df[df['발전량(MWh)'] != 0].copy()
@@ -18,6 +18,7 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split, GridSearchCV, KFold
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 from sklearn.inspection import permutation_importance
+from src.utils.schema import apply_schema
 
 # ✅ macOS 한글 폰트 설정
 plt.rcParams['font.family'] = 'AppleGothic'
@@ -86,6 +87,7 @@ def plot_actual_vs_pred(y_true, y_pred, title, path_png):
 print("📁 데이터 로드 중...")
 df = pd.read_csv(DATA_PATH, encoding="utf-8-sig")
 df.columns = df.columns.str.strip()
+df = apply_schema(df)  # 표준 dtype (category/float32/int16)
 df = df[df['발전량(MWh)'] != 0].copy()
 print(f"✅ 데이터 로드 완료 ({len(df)}행)")
 
@@ -94,7 +96,7 @@ rows_summary = []
 # --------------------------------------------------
 # 발전기별 학습 시작
 # --------------------------------------------------
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 16:
         print(f"⏭️ {gen_name}: 데이터 {len(group)}행 (스킵)")
         continue
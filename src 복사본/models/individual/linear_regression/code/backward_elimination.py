@@ -4,6 +4,7 @@ import os
 import statsmodels.api as sm
 from sklearn.preprocessing import StandardScaler
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # ----------------------------------------------------------
 # ⚙️ 경로 설정
@@ -20,7 +21,7 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 # ----------------------------------------------------------
 # 1️⃣ 데이터 로드
 # ----------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 df = df[df['발전량(MWh)'] != 0].copy()
 
 # ----------------------------------------------------------
@@ -61,7 +62,7 @@ def backward_elimination(X, y, significance_level=0.05):
 # ----------------------------------------------------------
 # 3️⃣ 발전기별 실행
 # ----------------------------------------------------------
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 10:
         print(f"⏩ {gen_name}: 데이터 부족 → 스킵")
         continue
@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 plt.rcParams['font.family'] = 'AppleGothic'
 plt.rcParams['axes.unicode_minus'] = False
@@ -20,10 +21,10 @@ os.makedirs(RESULT_DIR, exist_ok=True)
 os.makedirs(PLOT_DIR, exist_ok=True)
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 df = df[df['발전량(MWh)'] != 0].copy()
 
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 10:
         continue
 
@@ -5,6 +5,7 @@ from sklearn.linear_model import RidgeCV, LassoCV, ElasticNetCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import KFold
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 BASE_DIR = "/Users/parkhyeji/Desktop/PV"
 DATA_PATH = os.path.join(BASE_DIR, "data/outliers_removed/이상치제거_데이터.csv")
@@ -15,10 +16,10 @@ MODEL_DIR = os.path.join(BASE_DIR, "outputs/models/individual/linear_regression/
 os.makedirs(RESULT_DIR, exist_ok=True)
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 df = df[df['발전량(MWh)'] != 0].copy()
 
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 10:
         continue
     X = group[['설비용량(MW)', '평균기온', '평균습도', '총강수량', '총적설량',
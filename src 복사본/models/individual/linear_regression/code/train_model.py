@@ -12,6 +12,7 @@ from sklearn.metrics import r2_score, mean_squared_error
 # ✅ 모델 저장 유틸 임포트
 # ----------------------------------------------------------
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # ----------------------------------------------------------
 # ✅ macOS 한글 폰트 설정
@@ -43,7 +44,7 @@ OUTPUT_CSV = os.path.join(RESULT_DIR, "LR_results.csv")
 # ----------------------------------------------------------
 # 1️⃣ 데이터 로드
 # ----------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 
 # ----------------------------------------------------------
 # 2️⃣ 열별 결측치 개수 출력
@@ -67,7 +68,7 @@ print(f"✅ 발전량 0제거 후 데이터 로드 완료 ({len(df)}행)")
 # ----------------------------------------------------------
 results = []
 
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 10:
         print(f"⚠️ {gen_name}: 데이터 부족 ({len(group)}개) → 스킵")
         continue
@@ -7,6 +7,7 @@ from sklearn.metrics import r2_score
 from datetime import datetime
 import os
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # ----------------------------------------------------------
 # ✅ macOS 한글 폰트 설정
@@ -38,7 +39,7 @@ SUMMARY_CSV = os.path.join(RESULT_DIR, "RF_backward_elimination.csv")
 # ----------------------------------------------------------
 # 1️⃣ 데이터 로드 및 결측 처리
 # ----------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding="utf-8-sig")
+df = apply_schema(pd.read_csv(DATA_PATH, encoding="utf-8-sig"))
 
 # ----------------------------------------------------------
 # 2️⃣ 열별 결측치 개수 출력
@@ -67,7 +68,7 @@ base_features = [
 all_results = []
 summary_r2 = {}
 
-for gen_name, group in df.groupby("발전기명"):
+for gen_name, group in df.groupby("발전기명", observed=True):
     if len(group) < 10:
         print(f"⚠️ {gen_name}: 데이터 부족 → 스킵")
         continue
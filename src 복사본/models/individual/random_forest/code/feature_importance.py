@@ -7,6 +7,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score
 from datetime import datetime
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # ----------------------------------------------------------
 # ✅ macOS 한글 폰트 설정
@@ -37,7 +38,7 @@ OUTPUT_CSV = os.path.join(RESULT_DIR, "RF_feature_importance.csv")
 # ----------------------------------------------------------
 # 1️⃣ 데이터 로드
 # ----------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 
 # ----------------------------------------------------------
 # 2️⃣ 열별 결측치 개수 출력
@@ -65,7 +66,7 @@ features = [
 # ----------------------------------------------------------
 results = []
 
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 10:
         print(f"⚠️ {gen_name}: 데이터 부족 → 스킵")
         continue
@@ -6,6 +6,7 @@ from sklearn.model_selection import GridSearchCV, train_test_split
 import os, json
 from datetime import datetime
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # ----------------------------------------------------------
 # ✅ macOS 한글 폰트 설정
@@ -38,7 +39,7 @@ SUMMARY_CSV = os.path.join(RESULT_DIR, "RF_hyperparam_summary.csv")
 # ----------------------------------------------------------
 # 1️⃣ 데이터 로드
 # ----------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 
 
 # ----------------------------------------------------------
@@ -77,7 +78,7 @@ param_grid = {
 summary_results = {}
 summary_rows = []
 
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 10:
         print(f"⚠️ {gen_name}: 데이터 부족 → 스킵")
         continue
@@ -8,6 +8,7 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_squared_error
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # ----------------------------------------------------------
 # ✅ macOS 한글 폰트 설정
@@ -38,7 +39,7 @@ OUTPUT_CSV = os.path.join(RESULT_DIR, "RF_results.csv")
 # ----------------------------------------------------------
 # 1️⃣ 데이터 로드 및 결측치 처리
 # ----------------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+df = apply_schema(pd.read_csv(DATA_PATH, encoding='utf-8-sig'))
 
 # ----------------------------------------------------------
 # 2️⃣ 열별 결측치 개수 출력
@@ -63,7 +64,7 @@ print(f"✅ 발전량 0제거 후 데이터 로드 완료 ({len(df)}행)")
 # ----------------------------------------------------------
 results = []
 
-for gen_name, group in df.groupby('발전기명'):
+for gen_name, group in df.groupby('발전기명', observed=True):
     if len(group) < 10:
         print(f"⚠️ {gen_name}: 데이터 부족으로 스킵 ({len(group)}개)")
         continue
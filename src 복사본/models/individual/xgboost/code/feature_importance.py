@@ -15,6 +15,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 import seaborn as sns
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 # macOS 한글 폰트 설정
 plt.rcParams['font.family'] = 'AppleGothic'
@@ -33,11 +34,11 @@ os.makedirs(PLOT_DIR, exist_ok=True)
 os.makedirs(MODEL_DIR, exist_ok=True)
 
 # --------------------------------------------------
-df = pd.read_csv(DATA_PATH, encoding="utf-8-sig")
+df = apply_schema(pd.read_csv(DATA_PATH, encoding="utf-8-sig"))
 df = df[df["발전량(MWh)"] != 0].copy()
 
 results = []
-for gen_name, group in df.groupby("발전기명"):
+for gen_name, group in df.groupby("발전기명", observed=True):
     if len(group) < 30:
         continue
 
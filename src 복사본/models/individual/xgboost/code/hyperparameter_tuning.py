@@ -13,6 +13,7 @@ from xgboost import XGBRegressor
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 from src.utils.model_utils import save_model
+from src.utils.schema import apply_schema
 
 BASE_DIR = "/Users/parkhyeji/Desktop/PV"
 DATA_PATH = os.path.join(BASE_DIR, "data/outliers_removed/이상치제거_데이터.csv")
@@ -23,7 +24,7 @@ MODEL_DIR = os.path.join(BASE_DIR, "outputs/models/individual/XGB/hyperparameter
 os.makedirs(RESULT_DIR, exist_ok=True)
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-df = pd.read_csv(DATA_PATH, encoding="utf-8-sig")
+df = apply_schema(pd.read_csv(DATA_PATH, encoding="utf-8-sig"))
 df = df[df["발전량(MWh)"] != 0].copy()
 
 param_grid = {
@@ -35,7 +36,7 @@ param_grid = {
 }
 
 results = []
-for gen_name, group in df.groupby("발전기명"):
+for gen_name, group in df.groupby("발전기명", observed=True):
     if len(group) < 30:
         continue
 
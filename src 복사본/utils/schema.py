@@ -0,0 +1,8 @@
+# 학습 데이터 dtype 스키마
+# 대시보드와 같은 정의(저장소 루트의 schema.py)를 그대로 사용
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))  # 루트 모듈(schema) 사용
+from schema import CATEGORY_COLUMNS, FLOAT32_COLUMNS, INT16_COLUMNS, apply_schema, memory_mb  # noqa: E402,F401
@@ -0,0 +1,38 @@
+# tests/test_kma_parser.py
+# kma_parser Wide 포맷 파싱 확인 (python -m pytest -q tests)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import kma_parser
+
+TWO_ROW_TABLE = """
+# 기상청 수치예보
+| LAT | LON | NX | NY | 2026101800 | 2026101803 | 2026101806 |
+| 36.4 | 126.5 | 10 | 20 | 1.5 | -nan | abc |
+| 36.4 | 126.5 | 10 | 20 | 9.0 | 9.0 | 9.0 |
+"""
+
+
+def test_wide_uses_first_value_row_only():
+    df = kma_parser.parse_wide(TWO_ROW_TABLE, kma_parser.NWP_TIME_FORMAT, value_name="값")
+    # 두 번째 값 행은 무시, 'abc'는 버리고 '-nan'은 NaN으로 유지
+    assert len(df) == 2
+    assert df["값"].iloc[0] == 1.5
+    assert np.isnan(df["값"].iloc[1])
+    assert list(df["DATETIME"].dt.hour) == [0, 3]
+
+
+def test_wide_converts_utc_to_kst():
+    df = kma_parser.parse_wide(TWO_ROW_TABLE, kma_parser.NWP_TIME_FORMAT, utc_to_kst=True)
+    assert str(df["DATETIME"].dt.tz) == kma_parser.KST
+    assert df["DATETIME"].iloc[0].hour == 9
+
+
+def test_wide_rejects_header_value_mismatch():
+    text = "| LAT | LON | NX | NY | 2026101800 | 2026101803 |\n| 36.4 | 126.5 | 10 | 20 | 1.5 |\n"
+    assert kma_parser.parse_wide(text, kma_parser.NWP_TIME_FORMAT) is None
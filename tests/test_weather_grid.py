@@ -0,0 +1,50 @@
+# tests/test_weather_grid.py
+# weather_grid 묶음 규칙 확인 (python -m pytest -q tests)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import weather_grid
+
+LOCATIONS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "locations_원본.csv")
+
+
+def _locations():
+    df = pd.read_csv(LOCATIONS_FILE, encoding="utf-8-sig")
+    df['발전기명'] = df['발전기명'].str.strip()
+    return df
+
+
+def test_boryeong_pair_shares_one_request():
+    df = _locations()
+    cells, codes = weather_grid.group_by_cell(df, weather_grid.OPENMETEO_GRID_DEG)
+    by_name = dict(zip(df['발전기명'], codes))
+    assert by_name['보령태양광'] == by_name['신보령태양광']
+    # 약 8.6km 떨어진 제주/제주대는 따로 요청
+    assert by_name['제주태양광'] != by_name['제주대태양광']
+    assert len(cells) == len(df) - 1
+
+
+def test_requests_use_real_member_coordinates():
+    df = _locations()
+    cells, codes = weather_grid.group_by_cell(df, weather_grid.KMA_NWP_GRID_DEG)
+    member_coords = set(zip(df['위도'], df['경도']))
+    assert set(zip(cells['위도'], cells['경도'])) <= member_coords
+
+
+def test_neighbours_across_rounding_boundary_are_merged():
+    # 0.05 격자 반올림이면 서로 다른 칸(37.024 / 37.026)이지만 거리는 0.002도
+    codes, reps = weather_grid.assign_cells([37.024, 37.026], [127.0, 127.0], tolerance=0.05)
+    assert codes[0] == codes[1]
+    assert list(reps) == [0]
+
+
+def test_zero_tolerance_merges_identical_coordinates_only():
+    codes, _ = weather_grid.assign_cells([36.4, 36.4, 36.4001], [126.5, 126.5, 126.5], tolerance=0)
+    assert codes[0] == codes[1] != codes[2]
+    assert np.array_equal(codes, [0, 0, 1])
@@ -0,0 +1,133 @@
+# weather_features.py
+# 시간별 날씨 예보(최종_날씨_예측_데이터.csv 형식)를 일별 모델 입력(MODEL_FEATURES)으로 집계
+# - 모든 발전소의 시간별 데이터를 (발전기명, KST 날짜) 기준 한 번의 groupby로 줄임
+# - 단위는 7일발전량예측api.py의 Open-Meteo 일별 값 변환과 같게 맞춤
+#   (풍속 m/s 평균, 일조시간 합계(시간), 일사량 합계 × 0.0036)
+
+import os
+
+import pandas as pd
+
+from model_registry import MODEL_FEATURES, clean_plant_name
+
+HOURLY_FILE = "최종_날씨_예측_데이터.csv"
+KST = "Asia/Seoul"
+HOURS_PER_DAY = 24
+
+# Open-Meteo 일별 일사량(shortwave_radiation_sum)에 곱하는 값과 같은 환산 계수
+RADIATION_FACTOR = 0.0036
+
+# 일별 컬럼명: (시간별 컬럼명, 집계 방법)
+DAILY_AGGREGATIONS = {
+    '평균기온': ('기온', 'mean'),
+    '평균습도': ('상대습도', 'mean'),
+    '총강수량': ('강수량', 'sum'),
+    '총적설량': ('적설량', 'sum'),
+    '평균풍속': ('풍속', 'mean'),
+    '일조시간': ('일조시간', 'sum'),
+    '일사량': ('일사량', 'sum'),
+    '평균운량': ('운량(%)', 'mean'),
+}
+
+
+def to_kst_date(values):
+    """
+    시간 값을 KST 기준 날짜(자정으로 내린 tz 없는 Timestamp)로 변환
+    (+09:00/+00:00 등 오프셋이 있으면 KST로 바꾸고, 오프셋이 없으면 KST로 간주)
+    """
+    values = pd.Series(values)
+    try:
+        times = pd.to_datetime(values)
+    except ValueError:
+        # 서로 다른 오프셋이 섞여 있으면 UTC로 통일한 뒤 KST로 변환
+        times = pd.to_datetime(values, utc=True)
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(KST).dt.tz_localize(None)
+    return times.dt.floor('D')
+
+
+def aggregate_daily(hourly_df, location_df=None, min_hours=HOURS_PER_DAY):
+    """
+    시간별 DataFrame → (발전기명, 날짜)별 일별 DataFrame
+    - location_df가 있으면 설비용량(MW)(과 없는 경우 위도/경도)을 발전기명으로 붙임
+    - 관측 시간이 min_hours보다 적은 날(예보 첫날/마지막 날의 일부 구간)은 제외
+    """
+    df = hourly_df
+    missing = [src for src, _ in DAILY_AGGREGATIONS.values() if src not in df.columns]
+    if missing:
+        raise KeyError(f"시간별 데이터에 필요한 컬럼이 없습니다: {missing}")
+
+    keys = [
+        df['발전기명'].astype(str).str.strip().rename('발전기명'),
+        to_kst_date(df['날짜']).set_axis(df.index).rename('날짜'),
+    ]
+
+    named = {out: (src, how) for out, (src, how) in DAILY_AGGREGATIONS.items()}
+    named['시간수'] = ('기온', 'size')
+    for col in ('위도', '경도'):
+        if col in df.columns:
+            named[col] = (col, 'first')
+
+    sources = list(dict.fromkeys(src for src, _ in named.values()))
+    values = df[sources].apply(pd.to_numeric, errors='coerce')
+    daily = values.groupby(keys, sort=True).agg(**named).reset_index()
+
+    daily['일사량'] = daily['일사량'] * RADIATION_FACTOR
+
+    if min_hours:
+        partial = daily['시간수'] < min_hours
+        if partial.any():
+            print(f"ℹ️ 하루 {min_hours}시간이 안 되는 {int(partial.sum())}개 (발전소, 날짜)는 제외합니다.")
+        daily = daily[~partial]
+    daily = daily.drop(columns='시간수')
+
+    if location_df is not None:
+        loc = location_df.copy()
+        loc.columns = loc.columns.str.strip()
+        # '고흥만 수상태양광' / '고흥만수상태양광'처럼 공백만 다른 이름도 같은 발전소로 매칭
+        loc['_key'] = loc['발전기명'].map(clean_plant_name)
+        attach = ['설비용량(MW)'] + [c for c in ('위도', '경도') if c not in daily.columns]
+        daily['_key'] = daily['발전기명'].map(clean_plant_name)
+        daily = daily.merge(loc[['_key'] + attach].drop_duplicates('_key'), on='_key', how='left')
+        daily = daily.drop(columns='_key')
+
+    daily['날짜'] = daily['날짜'].dt.date
+    return daily.reset_index(drop=True)
+
+
+def split_by_plant(daily_df, location_df=None):
+    """
+    일별 DataFrame을 발전소별 DataFrame 리스트로 분리
+    (location_df가 있으면 그 순서와 원래 발전기명 표기를 따름 → decode_responses 결과와 같은 형태)
+    """
+    if location_df is None:
+        return [g.reset_index(drop=True) for _, g in daily_df.groupby('발전기명', sort=False)]
+
+    groups = dict(tuple(daily_df.groupby(daily_df['발전기명'].map(clean_plant_name), sort=False)))
+
+    frames = []
+    for name in location_df['발전기명']:
+        frame = groups.get(clean_plant_name(name))
+        if frame is None:
+            print(f"⚠️ 경고: '{name}'의 시간별 날씨 데이터가 없습니다.")
+            continue
+        frame = frame.reset_index(drop=True)
+        frame['발전기명'] = name
+        frames.append(frame)
+    return frames
+
+
+def load_hourly_daily(hourly_file=HOURLY_FILE, location_df=None, min_hours=HOURS_PER_DAY):
+    """
+    시간별 예보 파일을 읽어 모델 입력 컬럼(MODEL_FEATURES)을 가진 일별 DataFrame으로 반환
+    """
+    if not os.path.exists(hourly_file):
+        raise FileNotFoundError(f"❌ 시간별 날씨 파일을 찾을 수 없습니다: {hourly_file}")
+
+    hourly_df = pd.read_csv(hourly_file, encoding='utf-8-sig')
+    daily = aggregate_daily(hourly_df, location_df, min_hours=min_hours)
+
+    absent = [c for c in MODEL_FEATURES if c not in daily.columns]
+    if absent:
+        print(f"⚠️ 일별 집계 결과에 없는 모델 입력 컬럼: {absent}")
+    return daily
@@ -0,0 +1,83 @@
+# weather_grid.py
+# 날씨 API 요청 전에 서로 가까운 발전소를 묶어 한 번만 요청하고 결과를 나눠 줌(fan-out)
+# - 보령/신보령(약 2km)처럼 같은 격자 값을 받는 발전소는 요청 하나를 나눠 씀
+# - 요청은 항상 묶음 대표(처음 나온 발전소)의 실제 좌표로 보냄 (격자점으로 옮긴 좌표를 보내면
+#   제공처가 다른 격자/바다 위 점의 값을 돌려줄 수 있음)
+# - 발전소를 순서대로 보며 대표와의 거리가 tolerance(도) 이내면 그 묶음에 넣고, 아니면 새 대표가 됨
+#   (거리 = 위도 차와 cos(위도)를 곱한 경도 차의 유클리드 거리, 즉 위도 1도 단위)
+#   tolerance는 제공처 격자 간격(~0.1도)보다 훨씬 작게 줄 것 — 0이면 완전히 같은 좌표만 묶음
+
+import numpy as np
+import pandas as pd
+
+# 제공처별 기본 묶음 허용 거리 (도, 0.025도 ≈ 2.8km) — 격자 간격(~11km)의 1/4 수준
+OPENMETEO_GRID_DEG = 0.025
+KMA_NWP_GRID_DEG = 0.025
+
+CELL_COLUMN = "격자"
+
+
+def assign_cells(lat, lon, tolerance=OPENMETEO_GRID_DEG):
+    """
+    좌표 배열 → (발전소별 묶음 번호 배열, 대표 발전소 위치 배열)
+    각 발전소를 tolerance(도) 안에 있는 첫 대표에 붙이고, 없으면 새 대표로 등록
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    tolerance = float(tolerance or 0.0)
+
+    codes = np.empty(len(lat), dtype=np.int64)
+    reps = []
+    for i in range(len(lat)):
+        if reps:
+            d_lat = lat[reps] - lat[i]
+            d_lon = (lon[reps] - lon[i]) * np.cos(np.radians(lat[i]))
+            near = np.flatnonzero(np.hypot(d_lat, d_lon) <= tolerance)
+            if len(near):
+                codes[i] = near[0]
+                continue
+        codes[i] = len(reps)
+        reps.append(i)
+    return codes, np.asarray(reps, dtype=np.int64)
+
+
+def group_by_cell(location_df, tolerance=OPENMETEO_GRID_DEG):
+    """
+    (격자 DataFrame[위도, 경도, 격자], 발전소별 격자 번호 배열) 반환
+    격자 DataFrame의 위도/경도는 묶음 대표 발전소의 실제 좌표, 처음 등장한 순서대로 정렬됨
+    """
+    lat = np.asarray(location_df['위도'], dtype=float)
+    lon = np.asarray(location_df['경도'], dtype=float)
+    codes, reps = assign_cells(lat, lon, tolerance)
+    cells = pd.DataFrame({
+        '위도': lat[reps],
+        '경도': lon[reps],
+        CELL_COLUMN: [f"{lat[r]:.6f},{lon[r]:.6f}" for r in reps],
+    })
+    return cells, codes
+
+
+def fan_out(cell_results, cell_index):
+    """
+    격자별 결과 리스트 → 발전소 순서의 결과 리스트
+    """
+    return [cell_results[c] for c in cell_index]
+
+
+def fan_out_frame(frame, cells, cell_index, names, name_column='발전기명'):
+    """
+    name_column에 격자 키가 들어 있는 DataFrame을 발전소별 행으로 복제
+    (names: 발전소 순서의 발전기명)
+    """
+    mapping = pd.DataFrame({
+        CELL_COLUMN: cells[CELL_COLUMN].to_numpy()[cell_index],
+        name_column: list(names),
+    })
+    out = frame.rename(columns={name_column: CELL_COLUMN}).merge(mapping, on=CELL_COLUMN, how='inner')
+    return out.drop(columns=CELL_COLUMN)
+
+
+def report(cells, n_locations, provider):
+    saved = n_locations - len(cells)
+    if saved > 0:
+        print(f"🧭 {provider}: 발전소 {n_locations}곳 → 격자 {len(cells)}개 (요청 {saved}건 절약)")
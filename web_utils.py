@@ -11,132 +11,267 @@ import requests_cache
 import numpy as np
 import joblib 
 import pickle
+from model_registry import ModelRegistry
+import forecast_store
+import csv_snapshot
+from schema import apply_schema
+from plant_index import PlantTimeIndex
 
 # --------------------------------------------------------------
 # 1. 데이터 로드 (함수)
+# - 데이터셋마다 따로 캐시하고, 페이지는 필요한 것만 불러옴
+# - 캐시 키에 원본 파일의 수정 시각이 들어가 파일이 바뀌면 그 데이터셋만 다시 읽음
+# - 원본은 st.cache_resource로 모든 세션이 하나를 공유하고(피클/복사 없음),
+#   페이지에는 데이터를 복사하지 않는 얕은 복사본(view)을 넘김
+#   → pandas 3(requirements.txt에 고정)은 항상 Copy-on-Write라
+#     페이지에서 컬럼을 추가/수정해도 그 페이지의 복사본에만 적용됨
+#   (max_entries=1: 파일이 바뀌어 새로 읽으면 이전 버전은 메모리에서 버림)
 # --------------------------------------------------------------
-@st.cache_data
-def load_data():
 
-    # -----------------------------
-    # 발전소 위치 데이터
-    # -----------------------------
+LOCATIONS_FILE = "data/locations_원본.csv"
+GENERATION_FILE = "data/발전량.csv"
+REGION_SOLAR_DIR = "solar_analysis/"
+GEOJSON_FILE = "data/korea_geojson.json"
+PAST_FORECAST_FILE = "data/최종_과거_예측_데이터.csv"
+
+# CSV는 처음 읽을 때 정리까지 마친 결과를 Arrow 스냅샷으로 저장하고 다음부터 메모리 매핑으로 읽음
+# (아래 _read_* 함수의 파싱/정리 방식이나 schema.py를 바꾸면 이 값을 올려 기존 스냅샷을 무효화)
+# 모든 데이터셋은 schema.apply_schema로 표준 dtype(category, 기상 변수 float32, 발전량·합계 float64, int16) 적용
+SNAPSHOT_VERSION = "3"
+
+
+def _shared_view(df):
+    # 공유 원본과 데이터를 같이 쓰는 새 DataFrame 객체 (수정 시점에만 해당 컬럼이 복사됨)
+    return df.copy(deep=False)
+
+
+def _file_version(*paths):
+    # (경로, 수정 시각) 목록 — 파일이 없으면 None
+    # (캐시 함수의 version 인자로 넘겨 캐시 키에 포함시킴)
+    return tuple((p, os.path.getmtime(p) if os.path.exists(p) else None) for p in paths)
+
+
+# -----------------------------
+# 발전소 위치 데이터
+# -----------------------------
+def _read_locations(path):
+    df_locations = pd.read_csv(path)
+    df_locations["발전기명"] = df_locations["발전기명"].str.strip()
+    
+    # ❗️ [수정] 발전사 컬럼의 앞뒤 공백과 내부 공백을 모두 제거 (강력한 정제)
+    df_locations["발전사"] = df_locations["발전사"].str.strip().str.replace(' ', '') 
+    return apply_schema(df_locations)
+
+
+@st.cache_resource(max_entries=1)
+def _load_locations(path, version):
     try:
-        df_locations = pd.read_csv("data/locations_원본.csv")
-        df_locations["발전기명"] = df_locations["발전기명"].str.strip()
-        
-        # ❗️ [수정] 발전사 컬럼의 앞뒤 공백과 내부 공백을 모두 제거 (강력한 정제)
-        df_locations["발전사"] = df_locations["발전사"].str.strip().str.replace(' ', '') 
+        df_locations = csv_snapshot.load(path, _read_locations, SNAPSHOT_VERSION)
     except FileNotFoundError:
-        st.error("오류: data/locations_원본.csv 파일을 찾을 수 없습니다.")
+        st.error(f"오류: {path} 파일을 찾을 수 없습니다.")
         st.stop()
+    return df_locations
+
 
+def load_locations():
+    return _shared_view(_load_locations(LOCATIONS_FILE, _file_version(LOCATIONS_FILE)))
 
-    # -----------------------------
-    # 실제 발전량 데이터
-    # -----------------------------
+
+# -----------------------------
+# 실제 발전량 데이터
+# -----------------------------
+def _read_generation(path):
+    df_generation = pd.read_csv(path)
+    df_generation["날짜"] = pd.to_datetime(df_generation["날짜"], format="%Y.%m.%d")
+    return apply_schema(df_generation)
+
+
+def _load_generation(path):
     try:
-        df_generation = pd.read_csv("data/발전량.csv")
-        df_generation["날짜"] = pd.to_datetime(df_generation["날짜"], format="%Y.%m.%d")
+        df_generation = csv_snapshot.load(path, _read_generation, SNAPSHOT_VERSION)
     except FileNotFoundError:
-        st.error("오류: data/발전량.csv 파일을 찾을 수 없습니다.")
+        st.error(f"오류: {path} 파일을 찾을 수 없습니다.")
         st.stop()
     except ValueError:
-        st.error("오류: data/발전량.csv의 날짜 형식이 'YYYY.M.D'가 아닙니다.")
+        st.error(f"오류: {path}의 날짜 형식이 'YYYY.M.D'가 아닙니다.")
         st.stop()
+    return df_generation
+
 
+def load_generation():
+    # (발전기명, 날짜) 순으로 정렬된 프레임 (get_generation_index와 같은 데이터)
+    return _shared_view(get_generation_index().frame)
 
-    # -----------------------------
-    # 태양광 데이터(연/월별) - Choropleth Map 용
-    # -----------------------------
-    path = "solar_analysis/"
-    file_list = glob.glob(os.path.join(path, "*_solar_utf8.csv"))
 
+# -----------------------------
+# 태양광 데이터(연/월별) - Choropleth Map 용
+# -----------------------------
+def _read_region_solar_file(file):
+    # 연도 파일 하나 → [광역지자체, 월, 태양광, 연도] Long 포맷
+    year = int(os.path.basename(file).split("_")[0])
+
+    df = pd.read_csv(file)
+    df = df.rename(columns={"구분": "광역지자체"})
+    df["광역지자체"] = df["광역지자체"].str.strip()
+
+    month_cols = [f"{i}월" for i in range(1, 13)]
+
+    for c in month_cols:
+        if c in df.columns:
+            df[c] = df[c].astype(str).str.replace(",", "")
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    df_long = df.melt(
+        id_vars=["광역지자체"],
+        value_vars=month_cols,
+        var_name="월",
+        value_name="태양광",
+    )
+
+    df_long["연도"] = year
+    df_long["월"] = df_long["월"].str.replace("월", "").astype(int)
+    return apply_schema(df_long)
+
+
+@st.cache_resource(max_entries=1)
+def _load_region_solar(file_list, version):
     all_solar = []
     
     if not file_list:
         st.warning("경고: solar_analysis 폴더에 태양광 CSV 파일이 없습니다.")
-        df_region_solar_monthly = pd.DataFrame()
-        df_region_solar = pd.DataFrame()
-    else:
-        for file in file_list:
-            try:
-                year = int(os.path.basename(file).split("_")[0])
-            except:
-                continue
-
-            df = pd.read_csv(file)
-            df = df.rename(columns={"구분": "광역지자체"})
-            df["광역지자체"] = df["광역지자체"].str.strip()
-
-            month_cols = [f"{i}월" for i in range(1, 13)]
-
-            for c in month_cols:
-                if c in df.columns:
-                    df[c] = df[c].astype(str).str.replace(",", "")
-                    df[c] = pd.to_numeric(df[c], errors="coerce")
-
-            df_long = df.melt(
-                id_vars=["광역지자체"],
-                value_vars=month_cols,
-                var_name="월",
-                value_name="태양광",
-            )
-
-            df_long["연도"] = year
-            df_long["월"] = df_long["월"].str.replace("월", "").astype(int)
-
-            all_solar.append(df_long)
-
-        df_region_solar_monthly = pd.concat(all_solar, ignore_index=True)
-
-        df_region_solar = (
-            df_region_solar_monthly.groupby(["연도", "광역지자체"])["태양광"]
-            .sum()
-            .reset_index()
-        )
-    
-    # -----------------------------
-    # 지도 geojson
-    # -----------------------------
+        return pd.DataFrame(), pd.DataFrame()
+
+    for file in file_list:
+        try:
+            int(os.path.basename(file).split("_")[0])
+        except:
+            continue
+
+        all_solar.append(csv_snapshot.load(file, _read_region_solar_file, SNAPSHOT_VERSION))
+
+    # 연도 파일마다 category 값 목록이 달라 합친 뒤 다시 맞춤
+    df_region_solar_monthly = apply_schema(pd.concat(all_solar, ignore_index=True).astype({"광역지자체": str}))
+
+    df_region_solar = (
+        df_region_solar_monthly.groupby(["연도", "광역지자체"], observed=True)["태양광"]
+        .sum()
+        .reset_index()
+    )
+    return df_region_solar, df_region_solar_monthly
+
+
+def load_region_solar():
+    """
+    (연도별 합계, 월별) 지역 태양광 발전량
+    """
+    file_list = tuple(sorted(glob.glob(os.path.join(REGION_SOLAR_DIR, "*_solar_utf8.csv"))))
+    df_region_solar, df_region_solar_monthly = _load_region_solar(file_list, _file_version(*file_list))
+    return _shared_view(df_region_solar), _shared_view(df_region_solar_monthly)
+
+
+# -----------------------------
+# 지도 geojson
+# -----------------------------
+@st.cache_resource(max_entries=1)
+def _load_geojson(path, version):
     try:
-        with open("data/korea_geojson.json", "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             korea_geojson = json.load(f)
     except FileNotFoundError:
         korea_geojson = {}
         st.error("오류: korea_geojson.json 파일을 찾을 수 없습니다.")
         st.stop()
-        
-    # -----------------------------
-    # 미래/과거 예측 파일 로드
-    # -----------------------------
+    return korea_geojson
+
+
+def load_geojson():
+    # 모든 세션이 같은 dict를 공유하므로 수정하지 말 것 (draw_choropleth_map은 deepcopy 후 사용)
+    return _load_geojson(GEOJSON_FILE, _file_version(GEOJSON_FILE))
+
+
+# -----------------------------
+# 미래/과거 예측 파일 로드
+# -----------------------------
+@st.cache_resource(max_entries=1)
+def _load_today_forecast(version):
     try:
-        df_today_forecast = pd.read_csv("최종_일별_발전량_예측.csv", parse_dates=["날짜"])
-        if '날짜' in df_today_forecast.columns:
-            df_today_forecast["날짜"] = df_today_forecast["날짜"].dt.tz_localize(None)
+        # 타입이 지정된 Parquet가 있으면 CSV 파싱 없이 바로 사용
+        return apply_schema(forecast_store.read_forecast())
     except:
-        df_today_forecast = pd.DataFrame()
+        return pd.DataFrame()
 
+
+def load_today_forecast():
+    return _shared_view(_load_today_forecast(_file_version(forecast_store.FORECAST_CSV, forecast_store.FORECAST_PARQUET)))
+
+
+def _read_past_forecast(path):
+    df_past_forecast = pd.read_csv(path, parse_dates=["날짜"])
+    if '날짜' in df_past_forecast.columns:
+        df_past_forecast["날짜"] = df_past_forecast["날짜"].dt.tz_localize(None)
+    return apply_schema(df_past_forecast)
+
+
+def _load_past_forecast(path):
     try:
-        df_past_forecast = pd.read_csv(
-            "data/최종_과거_예측_데이터.csv", parse_dates=["날짜"]
-        )
-        if '날짜' in df_past_forecast.columns:
-            df_past_forecast["날짜"] = df_past_forecast["날짜"].dt.tz_localize(None)
+        df_past_forecast = csv_snapshot.load(path, _read_past_forecast, SNAPSHOT_VERSION)
     except:
         df_past_forecast = pd.DataFrame()
+    return df_past_forecast
+
+
+def load_past_forecast():
+    # (발전기명, 날짜) 순으로 정렬된 프레임 (get_past_forecast_index와 같은 데이터)
+    return _shared_view(get_past_forecast_index().frame)
 
+
+# -----------------------------
+# (발전기명, 날짜) 정렬 인덱스 — 발전소/기간 조회를 이진 탐색으로 (발전소별 페이지)
+# 발전량/과거 예측은 정렬된 인덱스 프레임 하나만 공유 (정렬 전 원본은 따로 캐시하지 않음)
+# -----------------------------
+@st.cache_resource(max_entries=1)
+def _generation_index(path, version):
+    return PlantTimeIndex(_load_generation(path))
+
+
+def get_generation_index():
+    return _generation_index(GENERATION_FILE, _file_version(GENERATION_FILE))
+
+
+@st.cache_resource(max_entries=1)
+def _past_forecast_index(path, version):
+    return PlantTimeIndex(_load_past_forecast(path))
+
+
+def get_past_forecast_index():
+    return _past_forecast_index(PAST_FORECAST_FILE, _file_version(PAST_FORECAST_FILE))
+
+
+def load_data():
+    """
+    기존 7개 묶음 반환 (호환용) — 새 코드는 필요한 load_* 함수만 호출
+    """
+    df_region_solar, df_region_solar_monthly = load_region_solar()
     return (
-        df_locations,
-        df_generation,
+        load_locations(),
+        load_generation(),
         df_region_solar,
-        korea_geojson,
-        df_today_forecast,
+        load_geojson(),
+        load_today_forecast(),
         df_region_solar_monthly,
-        df_past_forecast,
+        load_past_forecast(),
     )
 
 
+# --------------------------------------------------------------
+# 1-1. 발전소 모델 레지스트리 (세션/재실행 간 공유)
+# --------------------------------------------------------------
+@st.cache_resource
+def get_model_registry():
+    # 모델 객체는 복사하지 않고 모든 세션이 같은 레지스트리를 공유
+    return ModelRegistry()
+
+
 # --------------------------------------------------------------
 # 2. 오늘 예측 날씨 처리
 # --------------------------------------------------------------
@@ -172,6 +307,8 @@ def draw_choropleth_map(geojson, map_data, legend_title):
 
     m = folium.Map(location=[36.5, 127.5], zoom_start=7, tiles="OpenStreetMap")
     gj = copy.deepcopy(geojson)
+    # 필터 결과가 공유 데이터와 섞이지 않도록 이 함수 안에서만 쓰는 복사본에 컬럼 추가
+    map_data = map_data.copy()
 
     name_map = {
         "서울": "Seoul", "부산": "Busan", "대구": "Daegu", "인천": "Incheon",
@@ -27,11 +27,8 @@ h1, h2, h3 {
 
 st.title("☀️ 태양광 발전량 대시보드")
 
-(
-    df_locations, df_generation, df_region_solar,
-    korea_geojson, df_today_forecast, df_region_solar_monthly,
-    df_past_forecast
-) = web_utils.load_data()
+df_locations = web_utils.load_locations()
+df_today_forecast = web_utils.load_today_forecast()
 
 df_today, available = web_utils.process_weather_data(df_today_forecast, df_locations)
 
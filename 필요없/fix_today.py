@@ -4,12 +4,19 @@ import pandas as pd
 import requests
 import time
 import datetime
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))  # 루트 모듈(kma_client 등) 사용
+import kma_client
+import kma_parser
 
 # --- 1. 파라미터 설정 ---
 AUTH_KEY = "vLfGjQIPTia3xo0CD94muA"
 INPUT_FILE = "locations_원본.csv" # (UTF-8로 변환된 파일)
 OUTPUT_FILE = "today_forecast_3hourly_final.csv" # 덮어쓸 파일
-BASE_URL = "https://apihub.kma.go.kr/api/typ01/cgi-bin/url/nph_sun_nwp_txt"
+BASE_URL = kma_client.endpoint_url(kma_client.NWP_ENDPOINT)
+# 연결 풀/429 재시도/회로 차단은 kma_client가 담당
+client = kma_client.get_client()
 CONVERSION_FACTOR = (3 * 3600) / 1000000 
 VARIABLES_TO_FETCH = {
     "DSWRF": "일사", "TMP": "기온", "RH": "습도"
@@ -37,35 +44,7 @@ except Exception as e:
 
 all_parsed_data = []
 
-# --- 3. API 파서 함수 (이전과 동일) ---
-def parse_nwp_response(text_data, location_name, variable_name_korean):
-    try:
-        lines = text_data.strip().split('\n')
-        table_lines = [line.strip() for line in lines if line.strip().startswith('|')]
-        if len(table_lines) < 2: return None
-        header_line = table_lines[0]
-        headers = [h.strip() for h in header_line.split('|') if h.strip()]
-        data_line = table_lines[1]
-        values = [v.strip() for v in data_line.split('|') if v.strip()]
-        time_headers = headers[4:]
-        time_values = values[4:]
-        if len(time_headers) != len(time_values): return None
-        parsed_data = []
-        for dt_str, val_str in zip(time_headers, time_values):
-            try:
-                dt_utc = pd.to_datetime(dt_str, format='%Y%m%d%H').tz_localize('UTC')
-                dt_obj = dt_utc.tz_convert('Asia/Seoul')
-                value = float(val_str.replace('-nan', 'NaN'))
-            except ValueError:
-                continue
-            parsed_data.append({
-                "발전기명": location_name, "DATETIME": dt_obj,
-                "변수명": variable_name_korean, "값": value
-            })
-        return pd.DataFrame(parsed_data) if parsed_data else None
-    except Exception as e:
-        print(f"   -> [파싱 함수 오류] {location_name} ({variable_name_korean}): {e}")
-        return None
+# --- 3. API 파서: kma_parser.parse_nwp_response (UTC -> KST 변환 포함, 공용 파서) ---
 
 # --- 4. 메인 스크립트 실행 ---
 print(f"--- '오늘({TODAY_STR})' 예측 데이터 수동 수집 시작 ---")
@@ -95,17 +74,19 @@ try:
                 }
 
                 try:
-                    response = requests.get(BASE_URL, params=params, timeout=60) 
+                    response = client.get(BASE_URL, params=params, timeout=60) 
                     if response.status_code == 200:
                         data_text = response.text.strip()
                         if data_text and not data_text.startswith("#ERROR") and not data_text.startswith("<Error>"):
-                            df_temp = parse_nwp_response(data_text, location_name, var_name_korean)
+                            df_temp = kma_parser.parse_nwp_response(data_text, location_name, var_name_korean)
                             if df_temp is not None and not df_temp.empty:
                                 all_parsed_data.append(df_temp)
                         else:
                             print(f"   -> [API 오류] {period['name']} ({var_name_korean}) 응답: {data_text}")
                     else:
                         print(f"   -> [HTTP 오류] {period['name']} ({var_name_korean}): 상태 코드 {response.status_code}")
+                except kma_client.CircuitOpenError as e:
+                    print(f"   -> [요청 중단] {period['name']} ({var_name_korean}): {e}")
                 except requests.exceptions.Timeout:
                     print(f"   -> [네트워크 오류] {period['name']} ({var_name_korean}) 요청 시간 초과.")
                 except requests.exceptions.RequestException as e: